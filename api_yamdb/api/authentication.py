@@ -0,0 +1,55 @@
+from rest_framework import permissions
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api_yamdb.settings import ADMIN, MODERATOR
+
+CLAIM_FIELDS = ('username', 'role', 'is_staff', 'is_superuser')
+
+
+def get_access_token(user):
+    """Выдает токен доступа с полями пользователя, нужными для проверки
+    прав без обращения к базе данных."""
+    token = AccessToken.for_user(user)
+    for field in CLAIM_FIELDS:
+        token[field] = getattr(user, field)
+    return token
+
+
+class ClaimsUser(TokenUser):
+    """Пользователь, восстановленный из полей токена доступа."""
+
+    @property
+    def role(self):
+        return self.token['role']
+
+    @property
+    def is_admin(self):
+        return self.role == ADMIN
+
+    @property
+    def is_moderator(self):
+        return self.role == MODERATOR
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """Аутентификация, которая для безопасных методов собирает
+    пользователя из полей токена, не загружая его из базы данных.
+
+    Изменения роли и блокировка пользователя вступают в силу для
+    запросов на чтение только после истечения срока действия токена.
+    Запросы на запись и токены без полей пользователя по-прежнему
+    загружают пользователя из базы.
+    """
+
+    def authenticate(self, request):
+        self.safe_method = request.method in permissions.SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        if self.safe_method and all(
+            field in validated_token for field in CLAIM_FIELDS
+        ):
+            return ClaimsUser(validated_token)
+        return super().get_user(validated_token)
@@ -0,0 +1,115 @@
+from contextvars import ContextVar
+from itertools import count
+from threading import Lock
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework import permissions
+
+REPLICATED_MODELS = {
+    'reviews.category',
+    'reviews.comment',
+    'reviews.genre',
+    'reviews.leaderboardentry',
+    'reviews.recommendation',
+    'reviews.review',
+    'reviews.similartitle',
+    'reviews.title',
+}
+
+current_replica = ContextVar('current_replica', default=None)
+
+
+class ReplicaSelector:
+    """Выбирает реплику по кругу или с наименьшим числом запросов,
+    которые этот процесс обрабатывает на ней прямо сейчас."""
+
+    def __init__(self):
+        self.counter = count()
+        self.in_flight = {}
+        self.lock = Lock()
+
+    def acquire(self):
+        replicas = settings.REPLICA_DATABASES
+        with self.lock:
+            if settings.REPLICA_SELECTION == 'least_loaded':
+                alias = min(
+                    replicas, key=lambda alias: self.in_flight.get(alias, 0)
+                )
+            else:
+                alias = replicas[next(self.counter) % len(replicas)]
+            self.in_flight[alias] = self.in_flight.get(alias, 0) + 1
+        return alias
+
+    def release(self, alias):
+        with self.lock:
+            self.in_flight[alias] -= 1
+
+
+selector = ReplicaSelector()
+
+
+class ReplicaRouter:
+    """Направляет чтение каталога, отзывов и комментариев на реплику,
+    выбранную ReplicaRoutingMiddleware для текущего запроса."""
+
+    def db_for_read(self, model, **hints):
+        if model._meta.label_lower in REPLICATED_MODELS:
+            return current_replica.get()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.REPLICA_DATABASES
+
+
+def is_pinned(request):
+    # Срок проверяется по подписанному времени выдачи, а не только
+    # по max_age, который клиент может проигнорировать.
+    return request.get_signed_cookie(
+        settings.REPLICA_PIN_COOKIE,
+        default=None,
+        salt=settings.REPLICA_PIN_COOKIE,
+        max_age=settings.REPLICA_PIN_SECONDS,
+    ) is not None
+
+
+class ReplicaRoutingMiddleware:
+    """Отправляет безопасные запросы на реплики. Ответ на запрос на
+    запись ставит подписанную cookie, и REPLICA_PIN_SECONDS клиент с ней
+    читает из основной базы, чтобы видеть собственные изменения, пока
+    реплика догоняет. Закрепление хранится у клиента, поэтому действует
+    для любого процесса, который обработает следующий запрос."""
+
+    def __init__(self, get_response):
+        if not settings.REPLICA_DATABASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        safe = request.method in permissions.SAFE_METHODS
+        alias = None
+        if safe and not is_pinned(request):
+            alias = selector.acquire()
+        token = current_replica.set(alias)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_replica.reset(token)
+            if alias is not None:
+                selector.release(alias)
+        if not safe:
+            response.set_signed_cookie(
+                settings.REPLICA_PIN_COOKIE,
+                '1',
+                salt=settings.REPLICA_PIN_COOKIE,
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
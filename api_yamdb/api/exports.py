@@ -0,0 +1,152 @@
+import csv
+from collections import defaultdict
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from api_yamdb.settings import EXPORT_CHUNK_SIZE
+from reviews.models import Comment, Review, Title
+
+EXPORT_FIELDS = {
+    'titles': (
+        'id', 'name', 'year', 'description', 'rating', 'category', 'genre'
+    ),
+    'reviews': ('id', 'title_id', 'author', 'text', 'score', 'pub_date'),
+    'comments': (
+        'id', 'title_id', 'review_id', 'author', 'text', 'pub_date'
+    ),
+}
+
+
+def iterate_chunks(queryset, chunk_size=None):
+    """Читает строки пачками по возрастанию id: каждая пачка отдельным
+    запросом с LIMIT, так что в памяти одновременно не больше одной
+    пачки. В отличие от iterator() в Django 3.2 позволяет догрузить
+    связи для всей пачки одним запросом."""
+    chunk_size = chunk_size or EXPORT_CHUNK_SIZE
+    last_id = 0
+    while True:
+        chunk = list(
+            queryset.filter(id__gt=last_id).order_by('id')[:chunk_size]
+        )
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1]['id']
+
+
+def rename(row, **names):
+    for new, old in names.items():
+        row[new] = row.pop(old)
+    return row
+
+
+def export_titles(since, using):
+    queryset = Title.objects.using(using).values(
+        'id', 'name', 'year', 'description', 'rating', 'category__slug'
+    )
+    if since:
+        # У произведений нет даты публикации, новые и измененные
+        # отбираются по полю modified.
+        queryset = queryset.filter(modified__gte=since)
+    for chunk in iterate_chunks(queryset):
+        genres = defaultdict(list)
+        links = Title.genre.through.objects.using(using).filter(
+            title_id__in=[row['id'] for row in chunk]
+        ).order_by('genre__slug')
+        for title_id, slug in links.values_list('title_id', 'genre__slug'):
+            genres[title_id].append(slug)
+        yield [
+            {
+                **rename(row, category='category__slug'),
+                'genre': genres[row['id']],
+            }
+            for row in chunk
+        ]
+
+
+def export_reviews(since, using):
+    queryset = Review.objects.using(using).values(
+        'id', 'title_id', 'author__username', 'text', 'score', 'pub_date'
+    )
+    if since:
+        queryset = queryset.filter(pub_date__gte=since)
+    for chunk in iterate_chunks(queryset):
+        yield [rename(row, author='author__username') for row in chunk]
+
+
+def export_comments(since, using):
+    queryset = Comment.objects.using(using).values(
+        'id', 'review__title_id', 'review_id', 'author__username', 'text',
+        'pub_date',
+    )
+    if since:
+        queryset = queryset.filter(pub_date__gte=since)
+    for chunk in iterate_chunks(queryset):
+        yield [
+            rename(
+                row, title_id='review__title_id', author='author__username'
+            )
+            for row in chunk
+        ]
+
+
+EXPORTERS = {
+    'titles': export_titles,
+    'reviews': export_reviews,
+    'comments': export_comments,
+}
+
+EXPORT_MODELS = {
+    'titles': Title,
+    'reviews': Review,
+    'comments': Comment,
+}
+
+
+def render_ndjson(chunks, fields):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for chunk in chunks:
+        yield ''.join(
+            encoder.encode({field: row[field] for field in fields}) + '\n'
+            for row in chunk
+        )
+
+
+class Echo:
+    """Псевдофайл для csv.writer: writerow возвращает готовую строку."""
+
+    def write(self, value):
+        return value
+
+
+def csv_value(value):
+    if isinstance(value, list):
+        return ','.join(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def render_csv(chunks, fields):
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for chunk in chunks:
+        yield ''.join(
+            writer.writerow([csv_value(row[field]) for field in fields])
+            for row in chunk
+        )
+
+
+RENDERERS = {
+    'ndjson': ('application/x-ndjson', render_ndjson),
+    'csv': ('text/csv; charset=utf-8', render_csv),
+}
+
+
+def export_stream(kind, file_format, using, since=None):
+    """Возвращает тип содержимого и генератор частей выгрузки, которая
+    читается из базы `using`."""
+    content_type, render = RENDERERS[file_format]
+    return content_type, render(
+        EXPORTERS[kind](since, using), EXPORT_FIELDS[kind]
+    )
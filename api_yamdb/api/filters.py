@@ -1,16 +1,32 @@
+from django.db.models import Exists, OuterRef
 from django_filters import rest_framework
 
 from reviews.models import Title
 
 
+class CharInFilter(rest_framework.BaseInFilter, rest_framework.CharFilter):
+    """Принимает несколько значений через запятую: ?genre=drama,comedy."""
+
+
 class TitleFilter(rest_framework.FilterSet):
-    genre = rest_framework.CharFilter(
-        field_name='genre__slug', lookup_expr='icontains'
+    genre = CharInFilter(method='filter_genre')
+    category = CharInFilter(field_name='category__slug', lookup_expr='in')
+    year_min = rest_framework.NumberFilter(
+        field_name='year', lookup_expr='gte'
     )
-    category = rest_framework.CharFilter(
-        field_name='category__slug', lookup_expr='icontains'
+    year_max = rest_framework.NumberFilter(
+        field_name='year', lookup_expr='lte'
     )
 
     class Meta:
         model = Title
         fields = ('category', 'genre', 'name', 'year')
+
+    def filter_genre(self, queryset, name, value):
+        # EXISTS вместо JOIN: произведение с несколькими подходящими
+        # жанрами попадает в выдачу один раз и без DISTINCT.
+        return queryset.filter(Exists(
+            Title.genre.through.objects.filter(
+                title_id=OuterRef('pk'), genre__slug__in=value
+            )
+        ))
@@ -0,0 +1,89 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class QueryTimer:
+    def __init__(self):
+        self.queries = []
+        self.duration = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.duration += duration
+            self.queries.append((context['connection'].alias, duration, sql))
+
+
+class ServerTimingMiddleware:
+    """Считает запросы к БД, время SQL, представления, сериализации и
+    отрисовки ответа, отдает их в заголовке Server-Timing и пишет в лог
+    запросы, которые превысили пороги SQL_TIMING_QUERY_THRESHOLD или
+    SQL_TIMING_DURATION_THRESHOLD. Сериализация идет внутри
+    представления и вычитается из его времени. Включается настройкой
+    SQL_TIMING_ENABLED."""
+
+    def __init__(self, get_response):
+        if not settings.SQL_TIMING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer()
+        request._view_finished = None
+        # Пополняется представлениями с SerializationTimingMixin.
+        request.serialize_duration = 0
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        finished = time.perf_counter()
+        view_finished = request._view_finished or finished
+        timings = {
+            'db': timer.duration,
+            'view': view_finished - started - request.serialize_duration,
+            'serialize': request.serialize_duration,
+            'render': finished - view_finished,
+            'total': finished - started,
+        }
+        response['Server-Timing'] = ', '.join(
+            [f'db;dur={timings["db"] * 1000:.1f};desc="{len(timer.queries)} '
+             f'queries"']
+            + [
+                f'{name};dur={timings[name] * 1000:.1f}'
+                for name in ('view', 'serialize', 'render', 'total')
+            ]
+        )
+        if (
+            len(timer.queries) > settings.SQL_TIMING_QUERY_THRESHOLD
+            or timings['total'] * 1000
+            > settings.SQL_TIMING_DURATION_THRESHOLD
+        ):
+            logger.warning(
+                'Медленный запрос %s %s: %d запросов к БД, SQL %.1f мс, '
+                'всего %.1f мс\n%s',
+                request.method,
+                request.get_full_path(),
+                len(timer.queries),
+                timings['db'] * 1000,
+                timings['total'] * 1000,
+                '\n'.join(
+                    f'[{alias}] {duration * 1000:.1f} мс: {sql}'
+                    for alias, duration, sql in timer.queries
+                ),
+            )
+        return response
+
+    def process_template_response(self, request, response):
+        request._view_finished = time.perf_counter()
+        return response
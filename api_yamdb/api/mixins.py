@@ -1,7 +1,258 @@
-from rest_framework import mixins, viewsets
+import time
+from functools import lru_cache
+from hashlib import md5
+
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import Prefetch
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.functional import cached_property
+from django.utils.http import http_date, quote_etag
+from rest_framework import mixins, permissions, serializers, viewsets
+from rest_framework.response import Response
+
+from .serializers import SparseFieldsMixin
+from .utils import get_list_version_time, list_cache_key
+from api_yamdb.settings import LIST_CACHE_TIMEOUT
+from reviews.models import Review, Title
+
+
+class CachedListMixin:
+    def list(self, request, *args, **kwargs):
+        cache_key = list_cache_key(self.queryset.model, request)
+        data = cache.get(cache_key)
+        if data is not None:
+            return Response(data)
+        response = super().list(request, *args, **kwargs)
+        cache.set(cache_key, response.data, LIST_CACHE_TIMEOUT)
+        return response
+
+
+@lru_cache(maxsize=None)
+def timed_serializer_class(serializer_class):
+    """Подкласс сериализатора, который добавляет время to_representation
+    к счетчику запроса из ServerTimingMiddleware. При many=True он
+    становится дочерним сериализатором списка, и время суммируется по
+    объектам."""
+
+    def to_representation(self, instance):
+        started = time.perf_counter()
+        try:
+            return serializer_class.to_representation(self, instance)
+        finally:
+            self.context['request']._request.serialize_duration += (
+                time.perf_counter() - started
+            )
+
+    return type(
+        serializer_class.__name__,
+        (serializer_class,),
+        {
+            '__module__': serializer_class.__module__,
+            '__qualname__': serializer_class.__qualname__,
+            'to_representation': to_representation,
+        },
+    )
+
+
+class SerializationTimingMixin:
+    """Отдельно замеряет сериализацию для заголовка Server-Timing.
+    DRF строит serializer.data внутри представления, поэтому без этого
+    ее время попадало бы в общее время представления. Все сериализаторы
+    представления создаются через get_serializer(), поэтому замер
+    подключается только здесь."""
+
+    def get_serializer(self, *args, **kwargs):
+        serializer_class = self.get_serializer_class()
+        if hasattr(self.request._request, 'serialize_duration'):
+            serializer_class = timed_serializer_class(serializer_class)
+        kwargs.setdefault('context', self.get_serializer_context())
+        return serializer_class(*args, **kwargs)
+
+
+class ConditionalGetMixin:
+    """Отдает ETag и Last-Modified, вычисленные по сохраненным штампам
+    версий, и отвечает 304 без сериализации, если копия клиента
+    актуальна. Штампы списка возвращает обязательный метод
+    get_list_stamps() представления: они должны меняться при любой
+    записи в список, в том числе при удалении. Версии списков моделей
+    из `version_models` учитываются как данные вложенных объектов."""
+
+    version_models = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if not callable(getattr(cls, 'get_list_stamps', None)):
+            raise ImproperlyConfigured(
+                f'{cls.__name__} должен определять get_list_stamps().'
+            )
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request, self.get_list_stamps(), super().list, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        modified = (
+            self.filter_queryset(self.get_queryset())
+            .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+            .values_list('modified', flat=True)
+            .first()
+        )
+        if modified is None:
+            return super().retrieve(request, *args, **kwargs)
+        return self.conditional_response(
+            request, [modified], super().retrieve, *args, **kwargs
+        )
+
+    def conditional_response(self, request, stamps, view, *args, **kwargs):
+        stamps = list(stamps) + [
+            get_list_version_time(model) for model in self.version_models
+        ]
+        last_modified = max(
+            (stamp for stamp in stamps if stamp is not None), default=None
+        )
+        # Last-Modified точен до секунды, поэтому отдается только за уже
+        # прошедшую секунду: иначе запись в ту же секунду не изменила бы
+        # его, и If-Modified-Since получил бы 304 с устаревшими данными.
+        timestamp = last_modified and int(last_modified.timestamp())
+        if timestamp and timestamp >= int(time.time()):
+            timestamp = None
+        etag = quote_etag(
+            md5(f'{request.get_full_path()}:{stamps}'.encode()).hexdigest()
+        )
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        if response is None:
+            response = view(request, *args, **kwargs)
+        response['ETag'] = etag
+        if timestamp:
+            response['Last-Modified'] = http_date(timestamp)
+        return response
+
+
+def related_columns(field):
+    """Колонки связанной модели, которые читает поле сериализатора, или
+    None, если хватает внешнего ключа."""
+    field = getattr(field, 'child_relation', getattr(field, 'child', field))
+    if isinstance(field, serializers.SlugRelatedField):
+        return [field.slug_field]
+    if isinstance(field, serializers.BaseSerializer):
+        return [nested.source for nested in field.fields.values()]
+    return None
+
+
+def sparse_queryset(queryset, fields, extra_columns=()):
+    """Сужает запрос до колонок и связей, нужных полям `fields`."""
+    model = queryset.model
+    columns = {model._meta.pk.name, *extra_columns}
+    select, prefetch = [], []
+    for field in fields.values():
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            continue
+        related = related_columns(field)
+        if model_field.many_to_many:
+            prefetch.append(Prefetch(
+                field.source,
+                queryset=model_field.related_model.objects.only(*related),
+            ))
+            continue
+        columns.add(field.source)
+        if model_field.is_relation and related is not None:
+            select.append(field.source)
+            columns.update(f'{field.source}__{name}' for name in related)
+    return (
+        queryset.select_related(None)
+        .prefetch_related(None)
+        .select_related(*select)
+        .prefetch_related(*prefetch)
+        .only(*columns)
+    )
+
+
+class SparseFieldsetMixin:
+    """Разбирает параметры ?fields= и ?expand= безопасных запросов и
+    передает их сериализатору. При заданном ?fields= запрос к БД читает
+    только нужные колонки, а JOIN и prefetch делаются лишь для
+    запрошенных связей."""
+
+    @cached_property
+    def sparse_params(self):
+        if self.request.method not in permissions.SAFE_METHODS:
+            return None, ()
+        serializer_class = self.get_serializer_class()
+        params = {}
+        # Остальные сериализаторы, например похожих произведений,
+        # отдают объекты целиком.
+        if not issubclass(serializer_class, SparseFieldsMixin):
+            return None, ()
+        for param, allowed in (
+            ('fields', serializer_class().fields),
+            ('expand', serializer_class.expandable_fields),
+        ):
+            value = self.request.query_params.get(param)
+            if value is None:
+                continue
+            names = [name for name in value.split(',') if name]
+            unknown = set(names) - set(allowed)
+            if unknown:
+                raise serializers.ValidationError({param: (
+                    f'Неизвестные поля: {", ".join(sorted(unknown))}. '
+                    f'Допустимые значения: {", ".join(allowed)}'
+                )})
+            params[param] = names
+        return params.get('fields'), params.get('expand', ())
+
+    def get_serializer_context(self):
+        fields, expand = self.sparse_params
+        return {
+            **super().get_serializer_context(),
+            'fields': fields,
+            'expand': expand,
+        }
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.sparse_params[0] is None:
+            return queryset
+        cursor_pagination = getattr(
+            self.pagination_class, 'cursor_pagination_class', None
+        )
+        # Курсор строится по полям сортировки последнего объекта страницы.
+        ordering = [
+            name.lstrip('-')
+            for name in getattr(cursor_pagination, 'ordering', ())
+        ]
+        return sparse_queryset(
+            queryset, self.get_serializer().fields, ordering
+        )
+
+
+class TitleReviewLookupMixin:
+    """Находит произведение и отзыв из адреса запроса и хранит их на
+    экземпляре представления до конца запроса. Пара произведение-отзыв
+    проверяется одним запросом к отзывам."""
+
+    @cached_property
+    def title(self):
+        return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
+
+    @cached_property
+    def review(self):
+        return get_object_or_404(
+            Review,
+            pk=self.kwargs.get('review_id'),
+            title_id=self.kwargs.get('title_id'),
+        )
 
 
 class CreateListDestroyViewSet(
+    SerializationTimingMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
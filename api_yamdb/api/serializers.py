@@ -6,9 +6,21 @@ from django.core.validators import (
 from django.utils import timezone
 from rest_framework import serializers
 
-from .utils import check_email, check_role, check_user, send_mail_token
+from .utils import check_email, check_role, check_user, queue_mail_token
 from api_yamdb.settings import MAX_SCORE, MIN_SCORE
-from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.models import (
+    Category,
+    Comment,
+    Genre,
+    SCORE_FIELDS,
+    LeaderboardEntry,
+    Recommendation,
+    Review,
+    SimilarTitle,
+    Title,
+    User,
+)
+from reviews.search import SEARCH_KINDS
 
 
 class SendCodeSerializer(serializers.ModelSerializer):
@@ -33,7 +45,6 @@ class SendCodeSerializer(serializers.ModelSerializer):
             username=data['username'], email=data['email']
         ).last()
         if user:
-            send_mail_token(user)
             return data
         check_user(data)
         check_email(data)
@@ -43,10 +54,9 @@ class SendCodeSerializer(serializers.ModelSerializer):
         user = User.objects.filter(
             username=data['username'], email=data['email']
         ).last()
-        if user:
-            return user
-        user = User.objects.create(**data)
-        send_mail_token(user)
+        if not user:
+            user = User.objects.create(**data)
+        queue_mail_token(user)
         return user
 
 
@@ -147,6 +157,43 @@ class UserEditMeSerializer(serializers.ModelSerializer):
         return attrs
 
 
+class SparseFieldsMixin:
+    """Оставляет в ответе поля из context['fields'], если они заданы.
+    Связи из `expandable_fields` отдаются вложенными объектами, если они
+    перечислены в context['expand'] или раскрыты по умолчанию, и
+    идентификатором иначе. При явном списке полей раскрываются только
+    связи из context['expand']."""
+
+    expandable_fields = {}
+    expanded_by_default = ()
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = self.context.get('fields')
+        expanded = set(self.context.get('expand', ()))
+        if requested is None:
+            expanded |= set(self.expanded_by_default)
+        else:
+            fields = {
+                name: field
+                for name, field in fields.items()
+                if name in requested
+            }
+        for name, (collapsed, nested) in self.expandable_fields.items():
+            if name in fields:
+                fields[name] = nested() if name in expanded else collapsed()
+        return fields
+
+
+class AuthorSerializer(serializers.ModelSerializer):
+    """Автор отзыва или комментария. Ответы доступны анонимно, поэтому
+    профиль автора видят только администратор и сам пользователь."""
+
+    class Meta:
+        model = User
+        fields = ('username',)
+
+
 class GenreSerializer(serializers.ModelSerializer):
     class Meta:
         model = Genre
@@ -159,14 +206,32 @@ class CategorySerializer(serializers.ModelSerializer):
         exclude = ('id',)
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     rating = serializers.IntegerField(read_only=True)
     category = CategorySerializer(read_only=True)
     genre = GenreSerializer(read_only=True, many=True)
 
+    expandable_fields = {
+        'category': (
+            lambda: serializers.SlugRelatedField(
+                slug_field='slug', read_only=True
+            ),
+            lambda: CategorySerializer(read_only=True),
+        ),
+        'genre': (
+            lambda: serializers.SlugRelatedField(
+                slug_field='slug', read_only=True, many=True
+            ),
+            lambda: GenreSerializer(read_only=True, many=True),
+        ),
+    }
+    expanded_by_default = ('category', 'genre')
+
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = (
+            'rating_sum', 'rating_count', 'modified', *SCORE_FIELDS.values()
+        )
 
 
 class TitlePostPatchSerializer(serializers.ModelSerializer):
@@ -179,7 +244,10 @@ class TitlePostPatchSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = (
+            'rating_sum', 'rating_count', 'rating', 'modified',
+            *SCORE_FIELDS.values(),
+        )
 
     def validate_year(self, value):
         if value > timezone.now().year:
@@ -189,13 +257,24 @@ class TitlePostPatchSerializer(serializers.ModelSerializer):
         return value
 
 
-class CommentSerializer(serializers.ModelSerializer):
-    author = serializers.SlugRelatedField(
+def collapsed_author():
+    return serializers.SlugRelatedField(
         read_only=True,
         slug_field='username',
         default=serializers.CurrentUserDefault(),
     )
 
+
+AUTHOR_EXPANSION = {
+    'author': (collapsed_author, lambda: AuthorSerializer(read_only=True)),
+}
+
+
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    author = collapsed_author()
+
+    expandable_fields = AUTHOR_EXPANSION
+
     class Meta:
         model = Comment
         fields = ('id', 'text', 'author', 'pub_date')
@@ -212,35 +291,104 @@ class CurrentTitle:
         )
 
 
-class ReviewSerializer(serializers.ModelSerializer):
-    author = serializers.SlugRelatedField(
-        read_only=True,
-        slug_field='username',
-        default=serializers.CurrentUserDefault(),
-    )
+SCORE_VALIDATORS = [
+    MinValueValidator(
+        limit_value=MIN_SCORE,
+        message=f'Оценка не может быть меньше {MIN_SCORE}',
+    ),
+    MaxValueValidator(
+        limit_value=MAX_SCORE,
+        message=f'Оценка не может быть больше {MAX_SCORE}',
+    ),
+]
+
+
+class ReviewSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    author = collapsed_author()
     title = serializers.PrimaryKeyRelatedField(
         read_only=True,
         default=CurrentTitle(),
     )
-    score = serializers.IntegerField(
-        validators=[
-            MinValueValidator(
-                limit_value=MIN_SCORE,
-                message=f'Оценка не может быть меньше {MIN_SCORE}',
-            ),
-            MaxValueValidator(
-                limit_value=MAX_SCORE,
-                message=f'Оценка не может быть больше {MAX_SCORE}',
-            ),
-        ]
-    )
+    score = serializers.IntegerField(validators=SCORE_VALIDATORS)
+
+    expandable_fields = AUTHOR_EXPANSION
 
     class Meta:
         model = Review
-        fields = '__all__'
+        exclude = ('modified',)
         validators = [
             serializers.UniqueTogetherValidator(
                 queryset=Review.objects.all(),
                 fields=('author', 'title'),
             )
         ]
+
+
+class ReviewBulkItemSerializer(serializers.Serializer):
+    title = serializers.IntegerField()
+    text = serializers.CharField()
+    score = serializers.IntegerField(validators=SCORE_VALIDATORS)
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=200)
+    type = serializers.CharField(required=False)
+
+    def validate_type(self, value):
+        kinds = tuple(dict.fromkeys(value.split(',')))
+        unknown = set(kinds) - set(SEARCH_KINDS)
+        if unknown:
+            raise serializers.ValidationError(
+                f'Неизвестный тип: {", ".join(sorted(unknown))}. '
+                f'Допустимые значения: {", ".join(SEARCH_KINDS)}'
+            )
+        return kinds
+
+
+class SearchResultSerializer(serializers.Serializer):
+    type = serializers.CharField(source='kind')
+    id = serializers.IntegerField(source='object_id')
+    title_id = serializers.IntegerField(source='title_ref')
+    review_id = serializers.IntegerField(source='review_ref', allow_null=True)
+    snippet = serializers.CharField()
+    rank = serializers.FloatField()
+
+
+class ExportQuerySerializer(serializers.Serializer):
+    since = serializers.DateTimeField(required=False)
+
+
+class LeaderboardQuerySerializer(serializers.Serializer):
+    category = serializers.SlugField(required=False)
+    genre = serializers.SlugField(required=False)
+
+    def validate(self, data):
+        if len(data) > 1:
+            raise serializers.ValidationError(
+                'Укажите либо категорию, либо жанр.'
+            )
+        return data
+
+
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    title = TitleSerializer(read_only=True)
+
+    class Meta:
+        model = LeaderboardEntry
+        fields = ('score', 'title')
+
+
+class SimilarTitleSerializer(serializers.ModelSerializer):
+    title = TitleSerializer(source='similar', read_only=True)
+
+    class Meta:
+        model = SimilarTitle
+        fields = ('score', 'title')
+
+
+class RecommendationSerializer(serializers.ModelSerializer):
+    title = TitleSerializer(read_only=True)
+
+    class Meta:
+        model = Recommendation
+        fields = ('score', 'title')
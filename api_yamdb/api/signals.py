@@ -0,0 +1,25 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .utils import drop_list_cache, drop_own_profile_cache
+from reviews.models import Category, Genre, Title, User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    drop_own_profile_cache(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def catalog_changed(sender, **kwargs):
+    drop_list_cache(sender)
+
+
+@receiver(post_delete, sender=Title)
+def title_deleted(sender, **kwargs):
+    # Остальные изменения произведения видны по его полю modified.
+    drop_list_cache(sender)
@@ -1,12 +1,16 @@
-from django.urls import include, path
+from django.urls import include, path, re_path
 from rest_framework.routers import DefaultRouter
 
 from .views import (
     CategoryViewSet,
     CommentViewSet,
+    ExportView,
     GenreViewSet,
     GetTokenView,
+    LeaderboardView,
+    ReviewBulkView,
     ReviewViewSet,
+    SearchView,
     SendCodeView,
     TitleViewSet,
     UserViewSet,
@@ -33,4 +37,19 @@ urlpatterns = [
     path('v1/', include(router_v1.urls)),
     path('v1/auth/signup/', SendCodeView.as_view(), name='signup'),
     path('v1/auth/token/', GetTokenView.as_view(), name='get_token'),
+    path('v1/search/', SearchView.as_view(), name='search'),
+    path(
+        'v1/reviews/bulk/', ReviewBulkView.as_view(), name='reviews-bulk'
+    ),
+    re_path(
+        r'^v1/leaderboards/(?P<board>rating|reviews|trending)/$',
+        LeaderboardView.as_view(),
+        name='leaderboards',
+    ),
+    re_path(
+        r'^v1/export/(?P<kind>titles|reviews|comments)'
+        r'\.(?P<file_format>ndjson|csv)$',
+        ExportView.as_view(),
+        name='export',
+    ),
 ]
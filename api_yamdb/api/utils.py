@@ -1,21 +1,81 @@
+import time
+from datetime import datetime, timedelta
+
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
+from django.core.cache import cache
+from django.utils import timezone
 from rest_framework import serializers
 
-from api_yamdb.settings import ADMIN, DEFAULT_FROM_EMAIL, MODERATOR, USER
-from reviews.models import User
+from api_yamdb.settings import (
+    ADMIN,
+    EMAIL_OUTBOX_DEDUP_WINDOW,
+    MODERATOR,
+    USER,
+)
+from reviews.models import OutgoingEmail, User
 
 
-def send_mail_token(user):
+def queue_mail_token(user):
+    already_queued = OutgoingEmail.objects.filter(
+        user=user,
+        created__gte=timezone.now()
+        - timedelta(seconds=EMAIL_OUTBOX_DEDUP_WINDOW),
+    ).exists()
+    if already_queued:
+        return
     token = default_token_generator.make_token(user)
-    send_mail(
+    OutgoingEmail.objects.create(
+        user=user,
         subject='Код для входа на сайт',
         message=f'Для входа на сайт - {token}',
-        from_email=DEFAULT_FROM_EMAIL,
-        recipient_list=(user.email,),
     )
 
 
+def get_full_user(user):
+    """Возвращает модель пользователя, загружая ее из базы, если
+    пользователь был восстановлен из токена."""
+    if isinstance(user, User):
+        return user
+    return User.objects.get(pk=user.pk)
+
+
+def own_profile_cache_key(user_id):
+    return f'users:me:{user_id}'
+
+
+def drop_own_profile_cache(user_id):
+    cache.delete(own_profile_cache_key(user_id))
+
+
+def list_cache_version_key(model):
+    return f'list-version:{model._meta.label_lower}'
+
+
+def get_list_cache_version(model):
+    """Версия данных модели - время последнего изменения в наносекундах."""
+    return cache.get_or_set(list_cache_version_key(model), time.time_ns, None)
+
+
+def get_list_version_time(model):
+    return datetime.fromtimestamp(
+        get_list_cache_version(model) / 10 ** 9, tz=timezone.utc
+    )
+
+
+def list_cache_key(model, request):
+    """Ключ кэша списка: версия данных модели плюс адрес запроса со
+    всеми параметрами поиска и пагинации."""
+    version = get_list_cache_version(model)
+    return (
+        f'list:{model._meta.label_lower}:{version}:'
+        f'{request.get_host()}{request.get_full_path()}'
+    )
+
+
+def drop_list_cache(model):
+    cache.set(list_cache_version_key(model), time.time_ns(), None)
+
+
 def check_user(data):
     if User.objects.filter(username=data['username']):
         raise serializers.ValidationError(
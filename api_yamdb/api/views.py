@@ -1,15 +1,28 @@
 from django.contrib.auth.tokens import default_token_generator
-from django.db.models import Avg
+from django.core.cache import cache
+from django.db import IntegrityError, router, transaction
+from django.db.models import Max
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, permissions, status, viewsets
+from rest_framework import filters, generics, permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import AccessToken
 
+from .authentication import get_access_token
+from .exports import EXPORT_MODELS, export_stream
 from .filters import TitleFilter
-from .mixins import CreateListDestroyViewSet
+from .mixins import (
+    CachedListMixin,
+    ConditionalGetMixin,
+    CreateListDestroyViewSet,
+    SerializationTimingMixin,
+    SparseFieldsetMixin,
+    TitleReviewLookupMixin,
+)
+from .pagination import OptionalCursorPagination
 from .permissions import (
     IsAdmin,
     IsAdminModeratorOwnerOrReadOnly,
@@ -18,16 +31,46 @@ from .permissions import (
 from .serializers import (
     CategorySerializer,
     CommentSerializer,
+    ExportQuerySerializer,
     GenreSerializer,
     GetTokenSerializer,
+    LeaderboardEntrySerializer,
+    LeaderboardQuerySerializer,
+    RecommendationSerializer,
+    ReviewBulkItemSerializer,
     ReviewSerializer,
+    SearchQuerySerializer,
+    SearchResultSerializer,
     SendCodeSerializer,
+    SimilarTitleSerializer,
     TitlePostPatchSerializer,
     TitleSerializer,
     UserEditMeSerializer,
     UserMeSerializer,
 )
-from reviews.models import Category, Genre, Review, Title, User
+from .utils import (
+    get_full_user,
+    get_list_version_time,
+    own_profile_cache_key,
+)
+from api_yamdb.settings import (
+    OWN_PROFILE_CACHE_TIMEOUT,
+    REVIEWS_BULK_MAX_SIZE,
+)
+from reviews.leaderboards import category_scope, genre_scope
+from reviews.models import (
+    SCORE_FIELDS,
+    Category,
+    Genre,
+    LeaderboardEntry,
+    Review,
+    SimilarTitle,
+    Title,
+    User,
+)
+from reviews.recommendations import get_recommendations
+from reviews.utils import add_title_scores, get_histogram_stats
+from reviews.search import SEARCH_KINDS, search
 
 
 class SendCodeView(APIView):
@@ -51,7 +94,7 @@ class GetTokenView(APIView):
         if default_token_generator.check_token(
             user, serializer.validated_data['confirmation_code']
         ):
-            access_token = AccessToken.for_user(user)
+            access_token = get_access_token(user)
             return Response(
                 {'token': str(access_token)}, status=status.HTTP_200_OK
             )
@@ -61,7 +104,190 @@ class GetTokenView(APIView):
         )
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class SearchView(SerializationTimingMixin, generics.ListAPIView):
+    """Полнотекстовый поиск по произведениям, отзывам и комментариям,
+    лучшие совпадения первыми."""
+
+    permission_classes = (permissions.AllowAny,)
+    serializer_class = SearchResultSerializer
+
+    def get_queryset(self):
+        params = SearchQuerySerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        return search(
+            params.validated_data['q'],
+            params.validated_data.get('type', SEARCH_KINDS),
+        )
+
+
+class ExportView(APIView):
+    """Потоковая выгрузка всех произведений, отзывов или комментариев в
+    NDJSON или CSV. Параметр `since` оставляет записи, опубликованные
+    (для произведений — измененные) не раньше указанного момента."""
+
+    permission_classes = (IsAdmin,)
+
+    def get(self, request, kind, file_format):
+        params = ExportQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        # Запросы выгрузки выполняются, пока клиент читает ответ, то есть
+        # уже после ReplicaRoutingMiddleware, поэтому база выбирается
+        # сейчас.
+        content_type, stream = export_stream(
+            kind,
+            file_format,
+            router.db_for_read(EXPORT_MODELS[kind]),
+            params.validated_data.get('since'),
+        )
+        response = StreamingHttpResponse(stream, content_type=content_type)
+        response['Content-Disposition'] = (
+            f'attachment; filename="{kind}.{file_format}"'
+        )
+        return response
+
+
+class ReviewBulkView(APIView):
+    """Создает отзывы текущего пользователя на несколько произведений
+    одним запросом. Существование произведений и прежние отзывы
+    проверяются двумя запросами на весь пакет, отзывы вставляются через
+    bulk_create, а рейтинги обновляются одним запросом на каждое
+    значение оценки. Ошибка в одном отзыве не мешает создать остальные,
+    результат возвращается для каждого отзыва в порядке запроса."""
+
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def post(self, request):
+        if (
+            not isinstance(request.data, list)
+            or not 0 < len(request.data) <= REVIEWS_BULK_MAX_SIZE
+        ):
+            raise ValidationError(
+                f'Ожидается список от 1 до {REVIEWS_BULK_MAX_SIZE} отзывов.'
+            )
+        items = [ReviewBulkItemSerializer(data=item) for item in request.data]
+        titles, reviewed = self.check_titles(request.user, {
+            item.validated_data['title'] for item in items if item.is_valid()
+        })
+        results = []
+        reviews = {}
+        created = {}
+        for item in items:
+            if item.errors:
+                results.append({'status': 'error', 'errors': item.errors})
+                continue
+            title_id = item.validated_data['title']
+            result = {'status': 'error', 'title': title_id}
+            errors = self.title_errors(
+                title_id, titles, reviewed | reviews.keys()
+            )
+            if errors:
+                result['errors'] = errors
+            else:
+                reviews[title_id] = Review(
+                    author_id=request.user.pk,
+                    title_id=title_id,
+                    text=item.validated_data['text'],
+                    score=item.validated_data['score'],
+                )
+                result['status'] = 'created'
+                created[title_id] = result
+            results.append(result)
+        self.insert_reviews(request.user, reviews, created)
+        if not reviews:
+            return Response(results, status=status.HTTP_400_BAD_REQUEST)
+        # SQLite не возвращает id из bulk_create, но отзыв автора на
+        # произведение единственный, так что id находятся одним запросом.
+        ids = dict(
+            Review.objects.filter(
+                author_id=request.user.pk, title_id__in=reviews
+            ).values_list('title_id', 'id')
+        )
+        for title_id in reviews:
+            created[title_id]['id'] = ids[title_id]
+        return Response(results, status=status.HTTP_201_CREATED)
+
+    def insert_reviews(self, user, reviews, created):
+        """Вставляет отзывы и учитывает их оценки. Отзывы, которые не
+        удалось вставить, убираются из `reviews`, а их результаты в
+        `created` получают ошибку."""
+        while reviews:
+            try:
+                with transaction.atomic():
+                    # bulk_create не отправляет сигналы, поэтому рейтинги
+                    # обновляются явно.
+                    Review.objects.bulk_create(reviews.values())
+                    add_title_scores({
+                        title_id: review.score
+                        for title_id, review in reviews.items()
+                    })
+                return
+            except IntegrityError:
+                # Между проверкой и вставкой параллельный запрос создал
+                # отзыв или удалил произведение: такие отзывы получают
+                # ошибку, остальные вставляются повторно.
+                titles, reviewed = self.check_titles(user, reviews)
+                conflicts = (reviews.keys() - titles) | reviewed
+                if not conflicts:
+                    raise
+                for title_id in conflicts:
+                    del reviews[title_id]
+                    created[title_id].update(
+                        status='error',
+                        errors=self.title_errors(title_id, titles, reviewed),
+                    )
+
+    @staticmethod
+    def check_titles(user, title_ids):
+        """Существующие произведения из `title_ids` и те из них, на
+        которые у пользователя уже есть отзыв."""
+        titles = set(
+            Title.objects.filter(id__in=title_ids).values_list(
+                'id', flat=True
+            )
+        )
+        reviewed = set(
+            Review.objects.filter(
+                author_id=user.pk, title_id__in=titles
+            ).values_list('title_id', flat=True)
+        )
+        return titles, reviewed
+
+    @staticmethod
+    def title_errors(title_id, titles, reviewed):
+        if title_id not in titles:
+            return {'title': ['Произведение не найдено.']}
+        if title_id in reviewed:
+            return {'title': ['Отзыв на это произведение уже есть.']}
+        return None
+
+
+class LeaderboardView(SerializationTimingMixin, generics.ListAPIView):
+    """Лучшие произведения по заранее посчитанному рейтингу, в целом
+    или в категории или жанре. Страница читается по индексу таблицы
+    рейтингов, поэтому ее стоимость не зависит от числа произведений."""
+
+    permission_classes = (permissions.AllowAny,)
+    serializer_class = LeaderboardEntrySerializer
+
+    def get_queryset(self):
+        params = LeaderboardQuerySerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        scope = ''
+        if 'category' in params.validated_data:
+            scope = category_scope(params.validated_data['category'])
+        elif 'genre' in params.validated_data:
+            scope = genre_scope(params.validated_data['genre'])
+        return (
+            LeaderboardEntry.objects.filter(
+                board=self.kwargs['board'], scope=scope
+            )
+            .select_related('title__category')
+            .prefetch_related('title__genre')
+            .order_by('-score', 'title')
+        )
+
+
+class UserViewSet(SerializationTimingMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     filter_backends = (filters.SearchFilter,)
     permission_classes = (IsAdmin,)
@@ -79,21 +305,40 @@ class UserViewSet(viewsets.ModelViewSet):
     )
     def own_profile(self, request):
         user = request.user
+        cache_key = own_profile_cache_key(user.pk)
         if request.method == 'GET':
-            serializer = self.get_serializer(user, data=request.data)
-            serializer.is_valid(raise_exception=True)
-            serializer.save()
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            data = cache.get(cache_key)
+            if data is None:
+                data = self.get_serializer(get_full_user(user)).data
+                cache.set(cache_key, data, OWN_PROFILE_CACHE_TIMEOUT)
+            return Response(data, status=status.HTTP_200_OK)
         elif request.method == 'PATCH':
             serializer = self.get_serializer(
                 user, data=request.data, partial=True
             )
             serializer.is_valid(raise_exception=True)
             serializer.save()
+            cache.set(cache_key, serializer.data, OWN_PROFILE_CACHE_TIMEOUT)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @action(
+        detail=False,
+        methods=['get'],
+        url_path='me/recommendations',
+        permission_classes=[permissions.IsAuthenticated],
+        serializer_class=RecommendationSerializer,
+    )
+    def recommendations(self, request):
+        """Рекомендации из таблицы, которую заполняет команда
+        compute-recommendations."""
+        return Response(
+            self.get_serializer(
+                get_recommendations(request.user), many=True
+            ).data
+        )
+
 
-class GenreViewSet(CreateListDestroyViewSet):
+class GenreViewSet(CachedListMixin, CreateListDestroyViewSet):
     permission_classes = (IsAdminOrReadOnly,)
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
@@ -102,7 +347,7 @@ class GenreViewSet(CreateListDestroyViewSet):
     lookup_field = 'slug'
 
 
-class CategoryViewSet(CreateListDestroyViewSet):
+class CategoryViewSet(CachedListMixin, CreateListDestroyViewSet):
     permission_classes = (IsAdminOrReadOnly,)
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
@@ -111,71 +356,120 @@ class CategoryViewSet(CreateListDestroyViewSet):
     lookup_field = 'slug'
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    ConditionalGetMixin,
+    SerializationTimingMixin,
+    SparseFieldsetMixin,
+    viewsets.ModelViewSet,
+):
     permission_classes = (IsAdminOrReadOnly,)
-    queryset = Title.objects.annotate(rating=Avg('reviews__score'))
+    queryset = Title.objects.select_related('category').prefetch_related(
+        'genre'
+    )
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
+    serializer_class = TitleSerializer
+    version_models = (Category, Genre)
+
+    def get_list_stamps(self):
+        # Любое изменение произведения, в том числе его рейтинга, меняет
+        # поле modified, а удаление - версию списка произведений.
+        return [
+            Title.objects.aggregate(modified=Max('modified'))['modified'],
+            get_list_version_time(Title),
+        ]
 
     def get_serializer_class(self):
         if self.request.method == 'POST' or self.request.method == 'PATCH':
             return TitlePostPatchSerializer
-        return TitleSerializer
+        return super().get_serializer_class()
+
+    @action(detail=True, methods=['get'], url_path='rating-histogram')
+    def rating_histogram(self, request, pk=None):
+        """Распределение оценок произведения по сохраненным счетчикам,
+        без чтения отзывов."""
+        row = get_object_or_404(
+            Title.objects.values(*SCORE_FIELDS.values()), pk=pk
+        )
+        counts = {
+            score: row[field] for score, field in SCORE_FIELDS.items()
+        }
+        mean, median = get_histogram_stats(counts)
+        return Response({
+            'histogram': counts,
+            'count': sum(counts.values()),
+            'mean': mean,
+            'median': median,
+        })
+
+    @action(
+        detail=True, methods=['get'], serializer_class=SimilarTitleSerializer
+    )
+    def similar(self, request, pk=None):
+        """Похожие произведения из таблицы, которую заполняет команда
+        compute-similar-titles."""
+        entries = list(
+            SimilarTitle.objects.filter(title_id=pk)
+            .select_related('similar__category')
+            .prefetch_related('similar__genre')
+            .order_by('-score')
+        )
+        if not entries:
+            get_object_or_404(Title, pk=pk)
+        return Response(self.get_serializer(entries, many=True).data)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    ConditionalGetMixin,
+    SerializationTimingMixin,
+    SparseFieldsetMixin,
+    TitleReviewLookupMixin,
+    viewsets.ModelViewSet,
+):
     permission_classes = (
         IsAdminModeratorOwnerOrReadOnly,
         permissions.IsAuthenticatedOrReadOnly,
     )
     serializer_class = CommentSerializer
+    pagination_class = OptionalCursorPagination
 
     def get_queryset(self):
-        title = get_object_or_404(
-            Title,
-            pk=self.kwargs.get('title_id'),
-        )
-        review = get_object_or_404(
-            Review, title=title, pk=self.kwargs.get('review_id')
-        )
-        return review.comments.all()
+        return self.review.comments.select_related('author')
+
+    def get_list_stamps(self):
+        # Запись и удаление комментария меняют поле modified отзыва.
+        return [self.review.modified]
 
     def perform_create(self, serializer):
-        title = get_object_or_404(
-            Title,
-            pk=self.kwargs.get('title_id'),
-        )
-        review = get_object_or_404(
-            Review,
-            pk=self.kwargs.get('review_id'),
-            title=title,
-        )
         serializer.save(
             author=self.request.user,
-            review=review,
+            review=self.review,
         )
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(
+    ConditionalGetMixin,
+    SerializationTimingMixin,
+    SparseFieldsetMixin,
+    TitleReviewLookupMixin,
+    viewsets.ModelViewSet,
+):
     serializer_class = ReviewSerializer
     permission_classes = (
         IsAdminModeratorOwnerOrReadOnly,
         permissions.IsAuthenticatedOrReadOnly,
     )
+    pagination_class = OptionalCursorPagination
 
     def get_queryset(self):
-        title = get_object_or_404(
-            Title,
-            pk=self.kwargs.get('title_id'),
-        )
-        return title.reviews.all()
+        return self.title.reviews.select_related('author')
+
+    def get_list_stamps(self):
+        # Запись и удаление отзыва меняют поле modified произведения.
+        return [self.title.modified]
 
     def perform_create(self, serializer):
-        title = get_object_or_404(
-            Title,
-            pk=self.kwargs.get('title_id'),
-        )
         serializer.save(
             author=self.request.user,
-            title=title,
+            title=self.title,
         )
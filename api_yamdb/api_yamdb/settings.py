@@ -26,6 +26,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.ServerTimingMiddleware',
+    'api.db_routers.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -64,6 +66,40 @@ DATABASES = {
     }
 }
 
+REPLICA_DATABASES = []
+
+for index, replica_name in enumerate(
+    filter(None, os.getenv('DATABASE_REPLICAS', '').split(',')), start=1
+):
+    DATABASES[f'replica_{index}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': replica_name,
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(f'replica_{index}')
+
+DATABASE_ROUTERS = ['api.db_routers.ReplicaRouter']
+
+REPLICA_SELECTION = os.getenv('REPLICA_SELECTION', 'round_robin')
+
+REPLICA_PIN_SECONDS = 5
+
+REPLICA_PIN_COOKIE = 'replica_pin'
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -124,6 +160,12 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 DEFAULT_FROM_EMAIL = 'yamdb_admin@yamdb.ru'
 
+EMAIL_OUTBOX_DEDUP_WINDOW = 60
+
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+
+EMAIL_OUTBOX_RETRY_DELAY = 60
+
 MAX_SCORE = 10
 
 MIN_SCORE = 1
@@ -133,3 +175,42 @@ USER = 'user'
 MODERATOR = 'moderator'
 
 ADMIN = 'admin'
+
+OWN_PROFILE_CACHE_TIMEOUT = 60 * 15
+
+LIST_CACHE_TIMEOUT = 60 * 60
+
+EXPORT_CHUNK_SIZE = 2000
+
+REVIEWS_BULK_MAX_SIZE = 100
+
+LEADERBOARD_SIZE = 100
+
+# Вес априорной средней оценки в байесовском рейтинге: столько
+# "средних" отзывов добавляется к отзывам каждого произведения.
+LEADERBOARD_PRIOR_REVIEWS = 10
+
+LEADERBOARD_TRENDING_DAYS = 7
+
+SIMILAR_TITLES_COUNT = 20
+
+# Пользователи с большим числом отзывов дают квадратичное число пар
+# произведений и почти не несут сигнала о сходстве, их оценки в
+# подсчете пар не учитываются.
+SIMILAR_MAX_USER_REVIEWS = 1000
+
+RECOMMENDATIONS_COUNT = 20
+
+RECOMMENDATIONS_TTL = 60 * 60 * 24
+
+RECOMMENDATIONS_CHUNK_SIZE = 500
+
+# Добавляется к сумме сходств в знаменателе, чтобы произведение, похожее
+# лишь на один отзыв пользователя, не получало крайнюю оценку.
+RECOMMENDATIONS_SHRINKAGE = 1.0
+
+SQL_TIMING_ENABLED = os.getenv('SQL_TIMING_ENABLED', 'False') == 'True'
+
+SQL_TIMING_QUERY_THRESHOLD = 20
+
+SQL_TIMING_DURATION_THRESHOLD = 500
@@ -1,6 +1,16 @@
 from django.contrib import admin
 
-from .models import Category, Comment, Genre, Review, Title, User
+from .models import (
+    Category,
+    Comment,
+    Genre,
+    LeaderboardEntry,
+    OutgoingEmail,
+    Recommendation,
+    Review,
+    Title,
+    User,
+)
 
 
 @admin.register(User)
@@ -43,3 +53,25 @@ class ReviewAdmin(admin.ModelAdmin):
     search_fields = ('text',)
     list_filter = ('pub_date', 'author', 'score')
     list_per_page = 30
+
+
+@admin.register(LeaderboardEntry)
+class LeaderboardEntryAdmin(admin.ModelAdmin):
+    list_display = ('board', 'scope', 'title', 'score', 'refreshed')
+    list_filter = ('board',)
+    search_fields = ('scope', 'title__name')
+    list_per_page = 30
+
+
+@admin.register(Recommendation)
+class RecommendationAdmin(admin.ModelAdmin):
+    list_display = ('user', 'title', 'score', 'expires')
+    search_fields = ('user__username', 'title__name')
+    list_per_page = 30
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    search_fields = ('user__username', 'subject')
+    list_filter = ('sent_at', 'attempts')
+    list_per_page = 30
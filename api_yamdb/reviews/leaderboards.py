@@ -0,0 +1,102 @@
+from collections import defaultdict
+from datetime import timedelta
+from heapq import nlargest
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import LeaderboardEntry, Review, Title
+from api_yamdb.settings import (
+    LEADERBOARD_PRIOR_REVIEWS,
+    LEADERBOARD_SIZE,
+    LEADERBOARD_TRENDING_DAYS,
+)
+
+
+def category_scope(slug):
+    return f'category:{slug}'
+
+
+def genre_scope(slug):
+    return f'genre:{slug}'
+
+
+def collect_title_metrics(now):
+    """Собирает значения всех рейтингов и области (категорию и жанры)
+    каждого произведения. Сумма и число оценок уже хранятся в Title,
+    так что отзывы читаются только за последние
+    LEADERBOARD_TRENDING_DAYS дней."""
+    titles = Title.objects.values_list(
+        'id', 'category__slug', 'rating_sum', 'rating_count'
+    )
+    scopes = defaultdict(lambda: [''])
+    for title_id, slug in Title.genre.through.objects.values_list(
+        'title_id', 'genre__slug'
+    ):
+        scopes[title_id].append(genre_scope(slug))
+    recent = dict(
+        Review.objects.filter(
+            pub_date__gte=now - timedelta(days=LEADERBOARD_TRENDING_DAYS)
+        )
+        .values_list('title_id')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    titles = list(titles)
+    total_sum = sum(title[2] for title in titles)
+    total_count = sum(title[3] for title in titles)
+    mean = total_sum / total_count if total_count else 0
+    metrics = {}
+    for title_id, category, rating_sum, rating_count in titles:
+        title_scopes = scopes[title_id]
+        if category:
+            title_scopes.append(category_scope(category))
+        if not rating_count:
+            continue
+        metrics[title_id] = {
+            LeaderboardEntry.RATING: (
+                (mean * LEADERBOARD_PRIOR_REVIEWS + rating_sum)
+                / (LEADERBOARD_PRIOR_REVIEWS + rating_count)
+            ),
+            LeaderboardEntry.REVIEWS: rating_count,
+            LeaderboardEntry.TRENDING: recent.get(title_id, 0),
+        }
+    return metrics, scopes
+
+
+def refresh_leaderboards():
+    """Пересчитывает все рейтинги и возвращает количество областей.
+    Пересчет всегда полный: средняя оценка для байесовского рейтинга и
+    окно популярности меняются для всех произведений, а общая область
+    содержит каждое произведение."""
+    now = timezone.now()
+    metrics, title_scopes = collect_title_metrics(now)
+    members = defaultdict(list)
+    for title_id, scopes in title_scopes.items():
+        for scope in scopes:
+            members[scope].append(title_id)
+    entries = [
+        LeaderboardEntry(
+            board=board,
+            scope=scope,
+            title_id=title_id,
+            score=score,
+            refreshed=now,
+        )
+        for scope, title_ids in members.items()
+        for board, _ in LeaderboardEntry.BOARDS
+        for score, title_id in nlargest(
+            LEADERBOARD_SIZE,
+            (
+                (metrics[title_id][board], title_id)
+                for title_id in title_ids
+                if metrics.get(title_id, {}).get(board)
+            ),
+            key=lambda item: (item[0], -item[1]),
+        )
+    ]
+    with transaction.atomic():
+        LeaderboardEntry.objects.all().delete()
+        LeaderboardEntry.objects.bulk_create(entries, batch_size=500)
+    return len(members)
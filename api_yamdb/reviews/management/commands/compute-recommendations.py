@@ -0,0 +1,31 @@
+import time
+
+from django.core.management import BaseCommand, CommandError
+
+from api_yamdb.settings import RECOMMENDATIONS_CHUNK_SIZE
+from reviews.recommendations import refresh_recommendations
+
+
+class Command(BaseCommand):
+    help = (
+        'Считает рекомендации для авторов отзывов по спискам похожих '
+        'произведений. Запускается после compute-similar-titles'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=RECOMMENDATIONS_CHUNK_SIZE,
+            help='Количество пользователей в одной пачке',
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('Размер пачки должен быть положительным.')
+        started = time.monotonic()
+        count = refresh_recommendations(options['chunk_size'])
+        self.stdout.write(
+            f'Пересчитано пользователей: {count} за '
+            f'{time.monotonic() - started:.1f} с.'
+        )
@@ -0,0 +1,41 @@
+import os
+import time
+
+from django.core.management import BaseCommand, CommandError
+
+from reviews.similarity import refresh_similar_titles
+
+
+class Command(BaseCommand):
+    help = (
+        'Считает для каждого произведения список похожих по косинусному '
+        'сходству оценок пользователей'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help=(
+                'Пересчитать только произведения, затронутые отзывами '
+                'после прошлого запуска'
+            ),
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Количество процессов для расчета',
+        )
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1:
+            raise CommandError('Нужен хотя бы один процесс.')
+        started = time.monotonic()
+        count = refresh_similar_titles(
+            options['incremental'], options['workers']
+        )
+        self.stdout.write(
+            f'Пересчитано произведений: {count} за '
+            f'{time.monotonic() - started:.1f} с.'
+        )
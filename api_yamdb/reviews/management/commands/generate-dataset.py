@@ -0,0 +1,265 @@
+import csv
+import random
+import tempfile
+import time
+from array import array
+from bisect import bisect
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from pathlib import Path
+
+from django.core.management import BaseCommand, CommandError, call_command
+
+from api_yamdb.settings import MAX_SCORE, MIN_SCORE
+
+CSV_COLUMNS = {
+    'users': (
+        'id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'
+    ),
+    'category': ('id', 'name', 'slug'),
+    'genre': ('id', 'name', 'slug'),
+    'titles': ('id', 'name', 'year', 'category', 'description'),
+    'genre_title': ('id', 'title_id', 'genre_id'),
+    'review': ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+    'comments': ('id', 'review_id', 'text', 'author', 'pub_date'),
+}
+
+MAX_ATTEMPTS = 20
+
+WORDS = (
+    'сюжет', 'герой', 'финал', 'автор', 'атмосфера', 'диалоги', 'темп',
+    'музыка', 'идея', 'образ', 'сцена', 'стиль', 'жанр', 'язык', 'мир',
+    'отлично', 'скучно', 'неожиданно', 'сильно', 'слабо', 'честно',
+    'красиво', 'затянуто', 'смело', 'тонко', 'ярко', 'мрачно',
+)
+
+
+class ZipfSampler:
+    """Выбирает элементы с вероятностью, обратной рангу в степени
+    `exponent`. Ранги случайно переставлены, чтобы популярность не
+    совпадала с порядком идентификаторов."""
+
+    def __init__(self, rnd, items, exponent):
+        self.rnd = rnd
+        self.items = list(items)
+        rnd.shuffle(self.items)
+        self.cum_weights = array('d', accumulate(
+            1 / rank ** exponent for rank in range(1, len(self.items) + 1)
+        ))
+
+    def __call__(self):
+        return self.items[bisect(
+            self.cum_weights, self.rnd.random() * self.cum_weights[-1]
+        )]
+
+
+def random_text(rnd, prefix, words):
+    return f'{prefix}: ' + ' '.join(rnd.choices(WORDS, k=words)) + '.'
+
+
+def format_date(moment):
+    return moment.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+class DatasetWriter:
+    def __init__(self, options, output_dir):
+        self.options = options
+        self.output_dir = output_dir
+        self.rnd = random.Random(options['seed'])
+        self.started = datetime(2020, 1, 1, tzinfo=timezone.utc)
+        self.period = timedelta(days=options['days']).total_seconds()
+
+    def write(self, csv_file, rows):
+        path = self.output_dir / f'{csv_file}.csv'
+        with open(path, 'w', encoding='utf-8', newline='') as stream:
+            writer = csv.writer(stream)
+            writer.writerow(CSV_COLUMNS[csv_file])
+            writer.writerows(rows)
+
+    def users(self):
+        for idx in range(1, self.options['users'] + 1):
+            role = self.rnd.choices(
+                ('user', 'moderator', 'admin'), weights=(200, 5, 1)
+            )[0]
+            yield (
+                idx, f'user_{idx}', f'user_{idx}@yamdb.fake', role, '', '', ''
+            )
+
+    def catalog(self, prefix, count):
+        for idx in range(1, count + 1):
+            yield idx, f'{prefix.capitalize()} {idx}', f'{prefix}-{idx}'
+
+    def titles(self):
+        for idx in range(1, self.options['titles'] + 1):
+            yield (
+                idx,
+                f'Произведение {idx}',
+                self.rnd.randint(1900, self.started.year),
+                self.rnd.randint(1, self.options['categories']),
+                random_text(self.rnd, f'Описание {idx}', 12),
+            )
+
+    def genre_titles(self):
+        row_id = 0
+        genres = range(1, self.options['genres'] + 1)
+        for title_id in range(1, self.options['titles'] + 1):
+            count = min(len(genres), self.rnd.choice((1, 1, 2, 2, 3)))
+            for genre_id in self.rnd.sample(genres, count):
+                row_id += 1
+                yield row_id, title_id, genre_id
+
+    def reviews(self, review_dates):
+        users = self.options['users']
+        pick_title = ZipfSampler(
+            self.rnd, range(1, self.options['titles'] + 1),
+            self.options['popularity_skew'],
+        )
+        pick_author = ZipfSampler(
+            self.rnd, range(1, users + 1), self.options['activity_skew']
+        )
+        quality = [
+            self.rnd.uniform(3, 9) for _ in range(self.options['titles'] + 1)
+        ]
+        titles = self.options['titles']
+        # Пара (произведение, автор) хранится одним числом, чтобы
+        # проверка уникальности на миллионах отзывов занимала мало памяти.
+        seen = set()
+        for idx in range(1, self.options['reviews'] + 1):
+            for _ in range(MAX_ATTEMPTS):
+                title_id, author_id = pick_title(), pick_author()
+                if title_id * (users + 1) + author_id not in seen:
+                    break
+            else:
+                # Популярные произведения насыщаются: у них уже есть отзывы
+                # почти всех активных пользователей.
+                while title_id * (users + 1) + author_id in seen:
+                    title_id = self.rnd.randint(1, titles)
+                    author_id = self.rnd.randint(1, users)
+            seen.add(title_id * (users + 1) + author_id)
+            score = round(self.rnd.gauss(quality[title_id], 1.5))
+            pub_date = self.rnd.random() * self.period
+            review_dates.append(pub_date)
+            yield (
+                idx,
+                title_id,
+                random_text(self.rnd, f'Отзыв {idx}', 20),
+                author_id,
+                min(MAX_SCORE, max(MIN_SCORE, score)),
+                format_date(self.started + timedelta(seconds=pub_date)),
+            )
+
+    def comments(self, review_dates):
+        pick_review = ZipfSampler(
+            self.rnd, range(1, len(review_dates) + 1),
+            self.options['thread_skew'],
+        )
+        pick_author = ZipfSampler(
+            self.rnd, range(1, self.options['users'] + 1),
+            self.options['activity_skew'],
+        )
+        for idx in range(1, self.options['comments'] + 1):
+            review_id = pick_review()
+            delay = self.rnd.expovariate(1 / 86400)
+            yield (
+                idx,
+                review_id,
+                random_text(self.rnd, f'Комментарий {idx}', 8),
+                pick_author(),
+                format_date(self.started + timedelta(
+                    seconds=review_dates[review_id - 1] + delay
+                )),
+            )
+
+    def generate(self):
+        options = self.options
+        self.write('users', self.users())
+        self.write('category', self.catalog(
+            'category', options['categories']
+        ))
+        self.write('genre', self.catalog('genre', options['genres']))
+        self.write('titles', self.titles())
+        self.write('genre_title', self.genre_titles())
+        review_dates = array('d')
+        self.write('review', self.reviews(review_dates))
+        self.write('comments', self.comments(review_dates))
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует воспроизводимый синтетический набор данных в формате '
+        'CSV для load-csv или сразу загружает его в базу'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--titles', type=int, default=5000)
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--reviews', type=int, default=1000000)
+        parser.add_argument('--comments', type=int, default=2000000)
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=3 * 365,
+            help='Период, за который распределены даты публикаций',
+        )
+        parser.add_argument(
+            '--popularity-skew',
+            type=float,
+            default=1.1,
+            help='Показатель Ципфа для популярности произведений',
+        )
+        parser.add_argument(
+            '--activity-skew',
+            type=float,
+            default=1.0,
+            help='Показатель Ципфа для активности пользователей',
+        )
+        parser.add_argument(
+            '--thread-skew',
+            type=float,
+            default=1.2,
+            help='Показатель Ципфа для длины веток комментариев',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output-dir',
+            type=Path,
+            help='Сохранить CSV в папку вместо загрузки в базу',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if min(options['users'], options['titles'], options['genres'],
+               options['categories']) < 1:
+            raise CommandError(
+                'Нужен хотя бы один пользователь, произведение, жанр и '
+                'категория.'
+            )
+        if options['reviews'] > options['users'] * options['titles'] // 2:
+            raise CommandError(
+                'Слишком много отзывов: каждый пользователь оставляет не '
+                'больше одного отзыва на произведение.'
+            )
+        if options['comments'] and not options['reviews']:
+            raise CommandError('Комментариям нужны отзывы.')
+        started = time.monotonic()
+        if options['output_dir']:
+            options['output_dir'].mkdir(parents=True, exist_ok=True)
+            DatasetWriter(options, options['output_dir']).generate()
+            self.stdout.write(
+                f'CSV сохранены в {options["output_dir"]} за '
+                f'{time.monotonic() - started:.1f} с.'
+            )
+            return
+        with tempfile.TemporaryDirectory() as output_dir:
+            DatasetWriter(options, Path(output_dir)).generate()
+            call_command(
+                'load-csv',
+                data_dir=Path(output_dir),
+                batch_size=options['batch_size'],
+                stdout=self.stdout,
+            )
+        self.stdout.write(
+            f'Набор данных загружен за {time.monotonic() - started:.1f} с.'
+        )
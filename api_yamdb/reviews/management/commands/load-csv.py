@@ -1,7 +1,13 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager
 from csv import DictReader
+from itertools import islice
+from pathlib import Path
 
-from django.core.management import BaseCommand
-from django.shortcuts import get_object_or_404
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
 
 from reviews.models import (
     Category,
@@ -11,66 +17,256 @@ from reviews.models import (
     Title,
     User,
 )
+from reviews.utils import (
+    get_stale_ratings,
+    rebuild_title_ratings,
+    touch_reviews,
+    touch_titles,
+)
+
+# Файлы перечислены в порядке зависимостей по внешним ключам.
+CSV_FILES = (
+    'users',
+    'category',
+    'genre',
+    'titles',
+    'genre_title',
+    'review',
+    'comments',
+)
+
+FOREIGN_KEYS = {
+    'titles': {'category': Category},
+    'genre_title': {'title_id': Title, 'genre_id': Genre},
+    'review': {'title_id': Title, 'author': User},
+    'comments': {'review_id': Review, 'author': User},
+}
+
+
+def build_users(row):
+    return User(
+        id=row['id'],
+        username=row['username'],
+        email=row['email'],
+        role=row['role'],
+        bio=row['bio'],
+        first_name=row['first_name'],
+        last_name=row['last_name'],
+    )
+
+
+def build_category(row):
+    return Category(id=row['id'], name=row['name'], slug=row['slug'])
+
+
+def build_genre(row):
+    return Genre(id=row['id'], name=row['name'], slug=row['slug'])
+
+
+def build_titles(row):
+    return Title(
+        id=row['id'],
+        name=row['name'],
+        year=row['year'],
+        description=row.get('description') or None,
+        category_id=row['category'] or None,
+    )
+
+
+def build_review(row):
+    return Review(
+        id=row['id'],
+        title_id=row['title_id'],
+        text=row['text'],
+        author_id=row['author'],
+        score=row['score'],
+        pub_date=row['pub_date'],
+    )
+
+
+def build_comments(row):
+    return Comment(
+        id=row['id'],
+        review_id=row['review_id'],
+        text=row['text'],
+        author_id=row['author'],
+        pub_date=row['pub_date'],
+    )
+
+
+BUILDERS = {
+    'users': (User, build_users),
+    'category': (Category, build_category),
+    'genre': (Genre, build_genre),
+    'titles': (Title, build_titles),
+    'genre_title': (Title.genre.through, None),
+    'review': (Review, build_review),
+    'comments': (Comment, build_comments),
+}
+
+
+@contextmanager
+def keep_csv_dates(model):
+    """bulk_create подставляет текущее время в поля auto_now_add;
+    на время загрузки они отключаются, чтобы сохранить даты из CSV."""
+    fields = [
+        field
+        for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def read_batches(path, batch_size):
+    with open(path, encoding='utf-8', newline='') as csv_stream:
+        rows = DictReader(csv_stream)
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return
+            yield batch
+
+
+def link_genres(rows, replace, replaced_titles):
+    """Связывает произведения с жанрами одним INSERT на пакет строк
+    genre_title и возвращает количество записанных связей."""
+    genres_by_title = defaultdict(set)
+    for row in rows:
+        genres_by_title[int(row['title_id'])].add(int(row['genre_id']))
+    through = Title.genre.through
+    if replace:
+        # Старые жанры удаляются только при первой встрече произведения,
+        # иначе пакет стер бы связи, записанные предыдущими пакетами.
+        new_titles = genres_by_title.keys() - replaced_titles
+        through.objects.filter(title_id__in=new_titles).delete()
+        replaced_titles |= new_titles
+    links = [
+        through(title_id=title_id, genre_id=genre_id)
+        for title_id, genre_ids in genres_by_title.items()
+        for genre_id in genre_ids
+    ]
+    through.objects.bulk_create(links, ignore_conflicts=True)
+    # bulk_create и delete по промежуточной таблице не отправляют
+    # m2m_changed, поэтому штампы произведений сдвигаются явно.
+    touch_titles(genres_by_title.keys())
+    return len(links)
 
 
 class Command(BaseCommand):
     help = 'Загружает данные из CSV файлов в папке static/data'
 
     def add_arguments(self, parser):
-        parser.add_argument('csv_file', type=str)
+        parser.add_argument(
+            'csv_file',
+            type=str,
+            nargs='?',
+            choices=CSV_FILES,
+            help='Имя файла без расширения; по умолчанию загружаются все',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество строк в одной транзакции',
+        )
+        parser.add_argument(
+            '--data-dir',
+            type=Path,
+            default=settings.BASE_DIR / 'static' / 'data',
+            help='Папка с CSV файлами',
+        )
+        parser.add_argument(
+            '--replace-genres',
+            action='store_true',
+            help=(
+                'Заменять жанры произведений из genre_title вместо '
+                'добавления к уже существующим'
+            ),
+        )
 
     def handle(self, *args, **options):
-        csv_file = options['csv_file']
-        for row in DictReader(
-            open('./static/data/' + csv_file + '.csv', encoding='utf-8')
-        ):
-            if csv_file == 'category':
-                category = Category(
-                    id=row['id'], name=row['name'], slug=row['slug']
-                )
-                category.save()
-            elif csv_file == 'comments':
-                comment = Comment(
-                    id=row['id'],
-                    review=get_object_or_404(Review, pk=row['review_id']),
-                    text=row['text'],
-                    author=get_object_or_404(User, pk=row['author']),
-                    pub_date=row['pub_date'],
-                )
-                comment.save()
-            elif csv_file == 'genre_title':
-                title = get_object_or_404(Title, pk=row['title_id'])
-                title.genre.set([row['genre_id']])
-            elif csv_file == 'genre':
-                genre = Genre(id=row['id'], name=row['name'], slug=row['slug'])
-                genre.save()
-            elif csv_file == 'review':
-                review = Review(
-                    id=row['id'],
-                    title=get_object_or_404(Title, pk=row['title_id']),
-                    text=row['text'],
-                    author=get_object_or_404(User, pk=row['author']),
-                    score=row['score'],
-                    pub_date=row['pub_date'],
-                )
-                review.save()
-            elif csv_file == 'titles':
-                title = Title(
-                    id=row['id'],
-                    name=row['name'],
-                    year=row['year'],
-                    category=get_object_or_404(Category, pk=row['category']),
-                )
-                title.save()
-            elif csv_file == 'users':
-                user = User(
-                    id=row['id'],
-                    username=row['username'],
-                    email=row['email'],
-                    role=row['role'],
-                    bio=row['bio'],
-                    first_name=row['first_name'],
-                    last_name=row['last_name'],
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пакета должен быть положительным.')
+        csv_files = (
+            (options['csv_file'],) if options['csv_file'] else CSV_FILES
+        )
+        for csv_file in csv_files:
+            path = options['data_dir'] / f'{csv_file}.csv'
+            if not path.exists():
+                raise CommandError(f'Файл {path} не найден.')
+            self.load_file(
+                csv_file,
+                path,
+                options['batch_size'],
+                options['replace_genres'],
+            )
+        if 'review' in csv_files:
+            # bulk_create не отправляет сигналы, поэтому рейтинги
+            # произведений сверяются после загрузки отзывов.
+            rebuild_title_ratings(get_stale_ratings())
+
+    def load_file(self, csv_file, path, batch_size, replace_genres):
+        model, build = BUILDERS[csv_file]
+        # Уже загруженные строки пропускаются, чтобы повторный запуск
+        # не падал на первичном ключе. Идентификаторы связей genre_title
+        # не переносятся: дубли отсекаются уникальностью пары.
+        existing_ids = (
+            set()
+            if csv_file == 'genre_title'
+            else set(model.objects.values_list('id', flat=True))
+        )
+        known_ids = {
+            column: set(related_model.objects.values_list('id', flat=True))
+            for column, related_model in FOREIGN_KEYS.get(
+                csv_file, {}
+            ).items()
+        }
+        started = time.monotonic()
+        with keep_csv_dates(model):
+            loaded, skipped = self.load_rows(
+                csv_file, path, batch_size, replace_genres, existing_ids,
+                known_ids
+            )
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'{csv_file}: загружено строк {loaded}, пропущено {skipped}, '
+            f'{loaded / elapsed if elapsed else loaded:.0f} строк/с.'
+        )
+
+    def load_rows(self, csv_file, path, batch_size, replace_genres,
+                  existing_ids, known_ids):
+        model, build = BUILDERS[csv_file]
+        loaded = skipped = 0
+        replaced_titles = set()
+        for batch in read_batches(path, batch_size):
+            rows = [
+                row
+                for row in batch
+                if int(row['id']) not in existing_ids
+                and all(
+                    not row[column] or int(row[column]) in ids
+                    for column, ids in known_ids.items()
                 )
-                user.save()
-        print('Файл загружен.')
+            ]
+            skipped += len(batch) - len(rows)
+            with transaction.atomic():
+                if csv_file == 'genre_title':
+                    loaded += link_genres(
+                        rows, replace_genres, replaced_titles
+                    )
+                else:
+                    model.objects.bulk_create(
+                        map(build, rows), batch_size=batch_size
+                    )
+                    loaded += len(rows)
+                if csv_file == 'comments':
+                    # Сигналы комментариев не отправляются, а поле
+                    # modified отзыва - штамп списка его комментариев.
+                    touch_reviews({int(row['review_id']) for row in rows})
+        return loaded, skipped
@@ -0,0 +1,29 @@
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+
+from reviews.utils import get_stale_ratings, rebuild_title_ratings
+
+
+class Command(BaseCommand):
+    help = 'Сверяет и пересчитывает сохраненные рейтинги произведений'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить рейтинги, не исправляя их',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            stale = get_stale_ratings()
+            if options['check']:
+                if stale:
+                    raise CommandError(
+                        'Рейтинг расходится с отзывами у произведений: '
+                        + ', '.join(str(title.pk) for title in stale)
+                    )
+                self.stdout.write('Рейтинги актуальны.')
+                return
+            rebuild_title_ratings(stale)
+        self.stdout.write(f'Пересчитано произведений: {len(stale)}.')
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management import BaseCommand
+
+from reviews.leaderboards import refresh_leaderboards
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает рейтинги лучших произведений: по байесовской '
+        'оценке, по числу отзывов и по отзывам за последние дни. '
+        'Запускается периодически, например раз в час'
+    )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        scopes = refresh_leaderboards()
+        self.stdout.write(
+            f'Обновлено областей: {scopes} за '
+            f'{time.monotonic() - started:.1f} с.'
+        )
@@ -0,0 +1,92 @@
+import time
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from api_yamdb.settings import (
+    DEFAULT_FROM_EMAIL,
+    EMAIL_OUTBOX_MAX_ATTEMPTS,
+    EMAIL_OUTBOX_RETRY_DELAY,
+)
+from reviews.models import OutgoingEmail
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди исходящей почты'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Количество писем, отправляемых за один проход',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а проверять очередь каждые --interval с',
+        )
+        parser.add_argument('--interval', type=float, default=5)
+
+    def handle(self, *args, **options):
+        while True:
+            sent = failed = 0
+            while True:
+                batch_sent, batch_failed = self.send_batch(
+                    options['batch_size']
+                )
+                sent += batch_sent
+                failed += batch_failed
+                if batch_sent + batch_failed < options['batch_size']:
+                    break
+            if sent or failed or not options['loop']:
+                self.stdout.write(
+                    f'Отправлено писем: {sent}, с ошибкой: {failed}.'
+                )
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
+
+    def send_batch(self, batch_size):
+        now = timezone.now()
+        with transaction.atomic():
+            emails = list(
+                OutgoingEmail.objects.select_for_update(skip_locked=True)
+                .select_related('user')
+                .filter(
+                    sent_at__isnull=True,
+                    send_after__lte=now,
+                    attempts__lt=EMAIL_OUTBOX_MAX_ATTEMPTS,
+                )[:batch_size]
+            )
+            if not emails:
+                return 0, 0
+            sent = failed = 0
+            with get_connection() as connection:
+                for email in emails:
+                    email.attempts += 1
+                    try:
+                        EmailMessage(
+                            subject=email.subject,
+                            body=email.message,
+                            from_email=DEFAULT_FROM_EMAIL,
+                            to=(email.user.email,),
+                            connection=connection,
+                        ).send()
+                    except Exception as error:
+                        email.last_error = str(error)
+                        email.send_after = now + timedelta(
+                            seconds=EMAIL_OUTBOX_RETRY_DELAY
+                            * 2 ** (email.attempts - 1)
+                        )
+                        failed += 1
+                    else:
+                        email.sent_at = now
+                        sent += 1
+            OutgoingEmail.objects.bulk_update(
+                emails, ('attempts', 'last_error', 'send_after', 'sent_at')
+            )
+        return sent, failed
@@ -0,0 +1,129 @@
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.core.management import BaseCommand
+
+from reviews.utils import apply_sqlite_pragmas
+
+# Так Django открывает SQLite без дополнительных настроек: журнал DELETE
+# и пятисекундное ожидание блокировки модуля sqlite3.
+DEFAULT_TIMEOUT = 5
+
+
+def worker(path, tuned, deadline, stats, lock, write):
+    connection = sqlite3.connect(
+        path, timeout=DEFAULT_TIMEOUT, isolation_level=None
+    )
+    cursor = connection.cursor()
+    if tuned:
+        apply_sqlite_pragmas(cursor)
+    done = errors = 0
+    latencies = []
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            if write:
+                cursor.execute('BEGIN IMMEDIATE')
+                cursor.execute(
+                    'INSERT INTO review (title_id, score, text) '
+                    "VALUES (abs(random()) % 1000, 5, 'text')"
+                )
+                cursor.execute('COMMIT')
+            else:
+                cursor.execute(
+                    'SELECT count(*), avg(score) FROM review '
+                    'WHERE title_id = abs(random()) % 1000'
+                ).fetchall()
+        except sqlite3.OperationalError:
+            errors += 1
+            if connection.in_transaction:
+                cursor.execute('ROLLBACK')
+            continue
+        latencies.append(time.perf_counter() - started)
+        done += 1
+    connection.close()
+    kind = 'writes' if write else 'reads'
+    with lock:
+        stats[kind] += done
+        stats[f'{kind}_errors'] += errors
+        stats[f'{kind}_latencies'].extend(latencies)
+
+
+def run_profile(path, tuned, writers, readers, seconds):
+    stats = {
+        'writes': 0, 'writes_errors': 0, 'writes_latencies': [],
+        'reads': 0, 'reads_errors': 0, 'reads_latencies': [],
+    }
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(path, tuned, deadline, stats, lock, index < writers),
+        )
+        for index in range(writers + readers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats
+
+
+def p95(latencies):
+    if not latencies:
+        return 0
+    latencies = sorted(latencies)
+    return latencies[int(0.95 * (len(latencies) - 1))] * 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает конкурентные чтение и запись в SQLite с настройками '
+        'по умолчанию и с SQLITE_PRAGMAS'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument(
+            '--rows', type=int, default=100000,
+            help='Количество строк в таблице перед замером',
+        )
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            for tuned in (False, True):
+                path = str(Path(directory) / f'bench-{int(tuned)}.sqlite3')
+                self.prepare(path, options['rows'])
+                stats = run_profile(
+                    path, tuned, options['writers'], options['readers'],
+                    options['seconds'],
+                )
+                self.stdout.write(
+                    f'{"SQLITE_PRAGMAS" if tuned else "по умолчанию"}: '
+                    f'записей/с {stats["writes"] / options["seconds"]:.0f} '
+                    f'(p95 {p95(stats["writes_latencies"]):.1f} мс, '
+                    f'ошибок {stats["writes_errors"]}), '
+                    f'чтений/с {stats["reads"] / options["seconds"]:.0f} '
+                    f'(p95 {p95(stats["reads_latencies"]):.1f} мс, '
+                    f'ошибок {stats["reads_errors"]})'
+                )
+
+    def prepare(self, path, rows):
+        connection = sqlite3.connect(path)
+        connection.execute(
+            'CREATE TABLE review (id INTEGER PRIMARY KEY, '
+            'title_id INTEGER, score INTEGER, text TEXT)'
+        )
+        connection.execute('CREATE INDEX review_title ON review (title_id)')
+        connection.executemany(
+            'INSERT INTO review (title_id, score, text) VALUES (?, ?, ?)',
+            ((index % 1000, index % 10 + 1, 'text') for index in range(rows)),
+        )
+        connection.commit()
+        connection.close()
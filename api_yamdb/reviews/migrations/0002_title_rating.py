@@ -0,0 +1,50 @@
+# Generated by Django 3.2 on 2026-10-18 02:08
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+import reviews.validators
+
+
+def fill_ratings(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    titles = Title.objects.annotate(
+        actual_sum=Sum('reviews__score'), actual_count=Count('reviews')
+    ).filter(actual_count__gt=0)
+    for title in titles:
+        title.rating_sum = title.actual_sum
+        title.rating_count = title.actual_count
+        title.rating = title.actual_sum / title.actual_count
+    Title.objects.bulk_update(
+        titles, ('rating_sum', 'rating_count', 'rating'), batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.AlterField(
+            model_name='title',
+            name='year',
+            field=models.IntegerField(validators=[reviews.validators.year_validator], verbose_name='Год выпуска'),
+        ),
+        migrations.RunPython(fill_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 3.2 on 2026-10-18 02:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_year_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board', models.CharField(choices=[('rating', 'Лучшие по рейтингу'), ('reviews', 'Больше всего отзывов'), ('trending', 'Больше всего отзывов за последние дни')], max_length=16, verbose_name='Рейтинг')),
+                ('scope', models.CharField(blank=True, help_text='category:<slug>, genre:<slug> или пусто для всех', max_length=64, verbose_name='Категория или жанр')),
+                ('score', models.FloatField(verbose_name='Значение')),
+                ('refreshed', models.DateTimeField(verbose_name='Время пересчета')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Место в рейтинге',
+                'verbose_name_plural': 'Места в рейтингах',
+                'ordering': ('board', 'scope', '-score', 'title'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['board', 'scope', '-score', 'title'], name='leaderboard_page_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardentry',
+            constraint=models.UniqueConstraint(fields=('board', 'scope', 'title'), name='leaderboard_unique_title'),
+        ),
+    ]
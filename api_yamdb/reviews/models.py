@@ -1,11 +1,23 @@
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.utils.timezone import now
 
 from .validators import year_validator
 from api_yamdb.settings import ADMIN, MAX_SCORE, MIN_SCORE, MODERATOR, USER
 
 
+SCORE_FIELDS = {
+    score: f'score_{score}' for score in range(MIN_SCORE, MAX_SCORE + 1)
+}
+
+
+def score_counter(score):
+    return models.PositiveIntegerField(
+        f'Оценок {score}', default=0, editable=False
+    )
+
+
 class User(AbstractUser):
     username = models.CharField('Логин', max_length=150, unique=True)
     email = models.EmailField(max_length=254, unique=True)
@@ -76,7 +88,9 @@ class Category(models.Model):
 
 class Title(models.Model):
     name = models.CharField('Название', max_length=256)
-    year = models.IntegerField('Год выпуска', validators=[year_validator])
+    year = models.IntegerField(
+        'Год выпуска', validators=[year_validator], db_index=True
+    )
     description = models.TextField('Описание', blank=True, null=True)
     genre = models.ManyToManyField(Genre, verbose_name='Жанр')
     category = models.ForeignKey(
@@ -85,6 +99,18 @@ class Title(models.Model):
         on_delete=models.SET_NULL,
         null=True,
     )
+    rating_sum = models.PositiveIntegerField(
+        'Сумма оценок', default=0, editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        'Количество оценок', default=0, editable=False
+    )
+    rating = models.FloatField(
+        'Рейтинг', blank=True, null=True, editable=False
+    )
+    modified = models.DateTimeField(
+        'Время изменения', auto_now=True, db_index=True
+    )
 
     class Meta:
         verbose_name = 'Произведение'
@@ -95,6 +121,12 @@ class Title(models.Model):
         return self.name[:30]
 
 
+# Распределение оценок произведения: по счетчику на каждое значение
+# MIN_SCORE..MAX_SCORE, чтобы поля всегда совпадали с SCORE_FIELDS.
+for score, field_name in SCORE_FIELDS.items():
+    Title.add_to_class(field_name, score_counter(score))
+
+
 class Review(models.Model):
     title = models.ForeignKey(
         Title,
@@ -107,6 +139,7 @@ class Review(models.Model):
         'Время публикации',
         auto_now_add=True,
     )
+    modified = models.DateTimeField('Время изменения', auto_now=True)
     author = models.ForeignKey(
         User,
         verbose_name='Рецензирующий',
@@ -137,10 +170,31 @@ class Review(models.Model):
                 name='unique_review',
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_pub_date_idx',
+            )
+        ]
 
     def __str__(self):
         return self.text[:30]
 
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            # Прежняя оценка для пересчета рейтинга в post_save читается
+            # под блокировкой строки: иначе параллельные правки отзыва
+            # вычли бы из рейтинга одну и ту же оценку.
+            self._old_score = (
+                Review.objects.select_for_update()
+                .filter(pk=self.pk)
+                .values_list('score', flat=True)
+                .first()
+                if self.pk is not None
+                else None
+            )
+            super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     author = models.ForeignKey(
@@ -160,11 +214,171 @@ class Comment(models.Model):
         'Время публикации отзыва',
         auto_now_add=True,
     )
+    modified = models.DateTimeField('Время изменения', auto_now=True)
 
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('-pub_date',)
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx',
+            )
+        ]
 
     def __str__(self):
         return self.text[:30]
+
+
+class OutgoingEmail(models.Model):
+    user = models.ForeignKey(
+        User,
+        verbose_name='Получатель',
+        related_name='outgoing_emails',
+        on_delete=models.CASCADE,
+    )
+    subject = models.CharField('Тема', max_length=256)
+    message = models.TextField('Текст письма')
+    created = models.DateTimeField('Время постановки в очередь', default=now)
+    send_after = models.DateTimeField('Отправить не раньше', default=now)
+    sent_at = models.DateTimeField(
+        'Время отправки', blank=True, null=True, db_index=True
+    )
+    attempts = models.PositiveSmallIntegerField('Попытки отправки', default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('id',)
+        indexes = [
+            models.Index(
+                fields=['user', 'created'],
+                name='outgoing_email_user_idx',
+            )
+        ]
+
+    def __str__(self):
+        return self.subject[:30]
+
+
+class LeaderboardEntry(models.Model):
+    RATING = 'rating'
+    REVIEWS = 'reviews'
+    TRENDING = 'trending'
+    BOARDS = (
+        (RATING, 'Лучшие по рейтингу'),
+        (REVIEWS, 'Больше всего отзывов'),
+        (TRENDING, 'Больше всего отзывов за последние дни'),
+    )
+
+    board = models.CharField('Рейтинг', max_length=16, choices=BOARDS)
+    scope = models.CharField(
+        'Категория или жанр',
+        max_length=64,
+        blank=True,
+        help_text='category:<slug>, genre:<slug> или пусто для всех',
+    )
+    title = models.ForeignKey(
+        Title,
+        verbose_name='Произведение',
+        related_name='leaderboard_entries',
+        on_delete=models.CASCADE,
+    )
+    score = models.FloatField('Значение')
+    refreshed = models.DateTimeField('Время пересчета')
+
+    class Meta:
+        verbose_name = 'Место в рейтинге'
+        verbose_name_plural = 'Места в рейтингах'
+        ordering = ('board', 'scope', '-score', 'title')
+        constraints = [
+            models.UniqueConstraint(
+                fields=('board', 'scope', 'title'),
+                name='leaderboard_unique_title',
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['board', 'scope', '-score', 'title'],
+                name='leaderboard_page_idx',
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.board} {self.scope}: {self.title_id}'
+
+
+class SimilarTitle(models.Model):
+    title = models.ForeignKey(
+        Title,
+        verbose_name='Произведение',
+        related_name='similar_titles',
+        on_delete=models.CASCADE,
+    )
+    similar = models.ForeignKey(
+        Title,
+        verbose_name='Похожее произведение',
+        related_name='+',
+        on_delete=models.CASCADE,
+    )
+    score = models.FloatField('Сходство')
+    computed = models.DateTimeField('Время расчета')
+
+    class Meta:
+        verbose_name = 'Похожее произведение'
+        verbose_name_plural = 'Похожие произведения'
+        ordering = ('title', '-score')
+        constraints = [
+            models.UniqueConstraint(
+                fields=('title', 'similar'),
+                name='similar_title_unique',
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['title', '-score'],
+                name='similar_title_score_idx',
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.title_id} ~ {self.similar_id}'
+
+
+class Recommendation(models.Model):
+    user = models.ForeignKey(
+        User,
+        verbose_name='Пользователь',
+        related_name='recommendations',
+        on_delete=models.CASCADE,
+    )
+    title = models.ForeignKey(
+        Title,
+        verbose_name='Произведение',
+        related_name='+',
+        on_delete=models.CASCADE,
+    )
+    score = models.FloatField('Ожидаемая оценка')
+    expires = models.DateTimeField('Актуально до')
+
+    class Meta:
+        verbose_name = 'Рекомендация'
+        verbose_name_plural = 'Рекомендации'
+        ordering = ('user', '-score')
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'title'),
+                name='recommendation_unique_title',
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-score'],
+                name='recommendation_user_score_idx',
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} -> {self.title_id}'
@@ -0,0 +1,148 @@
+from collections import defaultdict
+from datetime import timedelta
+from heapq import nlargest
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import LeaderboardEntry, Recommendation, Review, SimilarTitle
+from api_yamdb.settings import (
+    MAX_SCORE,
+    MIN_SCORE,
+    RECOMMENDATIONS_CHUNK_SIZE,
+    RECOMMENDATIONS_COUNT,
+    RECOMMENDATIONS_SHRINKAGE,
+    RECOMMENDATIONS_TTL,
+)
+
+# Ограничение числа параметров в одном IN.
+QUERY_BATCH_SIZE = 500
+
+
+def iterate_authors(chunk_size):
+    """Авторы отзывов пачками по возрастанию id."""
+    last_id = 0
+    while True:
+        chunk = list(
+            Review.objects.filter(author_id__gt=last_id)
+            .order_by('author_id')
+            .values_list('author_id', flat=True)
+            .distinct()[:chunk_size]
+        )
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1]
+
+
+def load_neighbors(title_ids):
+    neighbors = defaultdict(list)
+    title_ids = sorted(title_ids)
+    for start in range(0, len(title_ids), QUERY_BATCH_SIZE):
+        rows = SimilarTitle.objects.filter(
+            title_id__in=title_ids[start:start + QUERY_BATCH_SIZE]
+        ).values_list('title_id', 'similar_id', 'score')
+        for title_id, similar_id, score in rows:
+            neighbors[title_id].append((similar_id, score))
+    return neighbors
+
+
+def recommend(ratings, neighbors, count=None):
+    """Ожидаемые оценки непросмотренных произведений по соседству
+    с оцененными: к средней оценке пользователя добавляется взвешенное
+    по сходству отклонение его оценок похожих произведений."""
+    mean = sum(ratings.values()) / len(ratings)
+    weighted = defaultdict(float)
+    weights = defaultdict(float)
+    for title_id, score in ratings.items():
+        for similar_id, similarity in neighbors.get(title_id, ()):
+            if similar_id in ratings:
+                continue
+            weighted[similar_id] += similarity * (score - mean)
+            weights[similar_id] += similarity
+    predicted = (
+        (
+            min(max(
+                mean + weighted[title_id]
+                / (weight + RECOMMENDATIONS_SHRINKAGE),
+                MIN_SCORE,
+            ), MAX_SCORE),
+            weight,
+            title_id,
+        )
+        for title_id, weight in weights.items()
+    )
+    return [
+        (score, title_id)
+        for score, _, title_id in nlargest(
+            count or RECOMMENDATIONS_COUNT,
+            predicted,
+            key=lambda item: (item[0], item[1], -item[2]),
+        )
+    ]
+
+
+def refresh_recommendations(chunk_size=None):
+    """Пересчитывает рекомендации всех авторов отзывов и возвращает их
+    число. В памяти одновременно находятся отзывы одной пачки
+    пользователей и соседи оцененных ими произведений."""
+    now = timezone.now()
+    expires = now + timedelta(seconds=RECOMMENDATIONS_TTL)
+    chunk_size = chunk_size or RECOMMENDATIONS_CHUNK_SIZE
+    processed = 0
+    for user_ids in iterate_authors(chunk_size):
+        ratings = defaultdict(dict)
+        for author_id, title_id, score in Review.objects.filter(
+            author_id__in=user_ids
+        ).values_list('author_id', 'title_id', 'score').order_by():
+            ratings[author_id][title_id] = score
+        neighbors = load_neighbors(
+            {title_id for rated in ratings.values() for title_id in rated}
+        )
+        entries = [
+            Recommendation(
+                user_id=user_id,
+                title_id=title_id,
+                score=score,
+                expires=expires,
+            )
+            for user_id, rated in ratings.items()
+            for score, title_id in recommend(rated, neighbors)
+        ]
+        with transaction.atomic():
+            Recommendation.objects.filter(user_id__in=user_ids).delete()
+            Recommendation.objects.bulk_create(entries, batch_size=500)
+        processed += len(user_ids)
+    Recommendation.objects.filter(expires__lte=now).delete()
+    return processed
+
+
+def get_recommendations(user):
+    """Рекомендации пользователя одним запросом по индексу
+    (пользователь, оценка). Произведения, оцененные после расчета,
+    отбрасываются при чтении. Пока рекомендаций нет или срок истек,
+    отдаются лучшие по общему рейтингу произведения, которые
+    пользователь не оценивал.
+
+    `user` может быть восстановлен из токена, поэтому фильтры строятся
+    по его id."""
+    reviewed = Review.objects.filter(author_id=user.pk).values('title_id')
+    entries = list(
+        Recommendation.objects.filter(
+            user_id=user.pk, expires__gt=timezone.now()
+        )
+        .exclude(title__in=reviewed)
+        .select_related('title__category')
+        .prefetch_related('title__genre')
+    )
+    if entries:
+        return entries
+    return list(
+        LeaderboardEntry.objects.filter(
+            board=LeaderboardEntry.RATING, scope=''
+        )
+        .exclude(title__in=reviewed)
+        .select_related('title__category')
+        .prefetch_related('title__genre')
+        .order_by('-score', 'title_id')[:RECOMMENDATIONS_COUNT]
+    )
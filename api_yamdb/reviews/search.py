@@ -0,0 +1,230 @@
+import re
+from functools import lru_cache
+
+from django.db import connections, router
+from django.db.models import F, FloatField, IntegerField, Q, Value
+from django.db.models.functions import Substr
+
+from .models import Comment, Review, Title
+
+SEARCH_KINDS = ('title', 'review', 'comment')
+
+# Внешние таблицы FTS5 хранят только индекс, текст читается из таблиц
+# моделей. Триггеры поддерживают индекс при любой записи, в том числе
+# при bulk_create в load-csv, который не отправляет сигналы.
+FTS_INDEXES = {
+    'title_fts': ('reviews_title', ('name', 'description')),
+    'review_fts': ('reviews_review', ('text',)),
+    'comment_fts': ('reviews_comment', ('text',)),
+}
+
+SNIPPET = "snippet({index}, -1, '<mark>', '</mark>', '…', 16)"
+
+FTS_SELECTS = {
+    'title': (
+        "SELECT 'title' AS kind, title_fts.rowid AS object_id, "
+        'title_fts.rowid AS title_ref, NULL AS review_ref, '
+        f'{SNIPPET.format(index="title_fts")} AS snippet, '
+        # Совпадение в названии весит больше, чем в описании.
+        '-bm25(title_fts, 10.0, 1.0) AS rank '
+        'FROM title_fts WHERE title_fts MATCH %s'
+    ),
+    'review': (
+        "SELECT 'review' AS kind, r.id AS object_id, "
+        'r.title_id AS title_ref, r.id AS review_ref, '
+        f'{SNIPPET.format(index="review_fts")} AS snippet, '
+        '-bm25(review_fts) AS rank '
+        'FROM review_fts JOIN reviews_review r ON r.id = review_fts.rowid '
+        'WHERE review_fts MATCH %s'
+    ),
+    'comment': (
+        "SELECT 'comment' AS kind, c.id AS object_id, "
+        'r.title_id AS title_ref, c.review_id AS review_ref, '
+        f'{SNIPPET.format(index="comment_fts")} AS snippet, '
+        '-bm25(comment_fts) AS rank '
+        'FROM comment_fts '
+        'JOIN reviews_comment c ON c.id = comment_fts.rowid '
+        'JOIN reviews_review r ON r.id = c.review_id '
+        'WHERE comment_fts MATCH %s'
+    ),
+}
+
+FTS_COUNTS = {
+    'title': 'SELECT count(*) FROM title_fts WHERE title_fts MATCH %s',
+    'review': 'SELECT count(*) FROM review_fts WHERE review_fts MATCH %s',
+    'comment': 'SELECT count(*) FROM comment_fts WHERE comment_fts MATCH %s',
+}
+
+RESULT_COLUMNS = (
+    'kind', 'object_id', 'title_ref', 'review_ref', 'snippet', 'rank'
+)
+
+
+@lru_cache(maxsize=None)
+def fts5_compiled(using):
+    with connections[using].cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return ('ENABLE_FTS5',) in cursor.fetchall()
+
+
+def has_fts5(connection):
+    return connection.vendor == 'sqlite' and fts5_compiled(connection.alias)
+
+
+def install_search_index(connection):
+    """Создает индексы FTS5 и триггеры, которых нет в базе, и
+    перестраивает индекс, если триггеров не было. Миграции SQLite
+    пересоздают таблицу при изменении поля и теряют ее триггеры, поэтому
+    функция вызывается после каждого migrate."""
+    if not has_fts5(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')"
+        )
+        existing = {name for name, in cursor.fetchall()}
+        for index, (table, columns) in FTS_INDEXES.items():
+            if table not in existing or f'{index}_ai' in existing:
+                continue
+            names = ', '.join(columns)
+            new = ', '.join(f'new.{column}' for column in columns)
+            old = ', '.join(f'old.{column}' for column in columns)
+            delete = (
+                f'INSERT INTO {index}({index}, rowid, {names}) '
+                f"VALUES ('delete', old.id, {old});"
+            )
+            insert = (
+                f'INSERT INTO {index}(rowid, {names}) VALUES (new.id, {new});'
+            )
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5('
+                f"{names}, content='{table}', content_rowid='id', "
+                "tokenize='unicode61 remove_diacritics 2')"
+            )
+            cursor.execute(
+                f'CREATE TRIGGER {index}_ai AFTER INSERT ON {table} '
+                f'BEGIN {insert} END'
+            )
+            cursor.execute(
+                f'CREATE TRIGGER {index}_ad AFTER DELETE ON {table} '
+                f'BEGIN {delete} END'
+            )
+            cursor.execute(
+                f'CREATE TRIGGER {index}_au AFTER UPDATE OF {names} '
+                f'ON {table} BEGIN {delete} {insert} END'
+            )
+            cursor.execute(f"INSERT INTO {index}({index}) VALUES ('rebuild')")
+
+
+def parse_terms(query):
+    return re.findall(r'\w+', query)
+
+
+def build_match(terms):
+    """Собирает выражение MATCH из слов запроса: каждое слово в кавычках,
+    чтобы операторы FTS5 из пользовательского ввода не разбирались,
+    последнее ищется по префиксу."""
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+class FullTextResults:
+    """Ленивая выборка результатов FTS5: Paginator запрашивает count() и
+    срез, и в базу уходят только COUNT и одна страница."""
+
+    def __init__(self, using, match, kinds):
+        self.using = using
+        self.match = match
+        self.kinds = kinds
+
+    def count(self):
+        sql = 'SELECT ' + ' + '.join(
+            f'({FTS_COUNTS[kind]})' for kind in self.kinds
+        )
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(sql, [self.match] * len(self.kinds))
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        limit = -1 if index.stop is None else max(index.stop - start, 0)
+        sql = (
+            ' UNION ALL '.join(FTS_SELECTS[kind] for kind in self.kinds)
+            + ' ORDER BY rank DESC, kind, object_id LIMIT %s OFFSET %s'
+        )
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                sql, [self.match] * len(self.kinds) + [limit, start]
+            )
+            return [
+                dict(zip(RESULT_COLUMNS, row)) for row in cursor.fetchall()
+            ]
+
+
+def contains_all(fields, terms):
+    condition = Q()
+    for term in terms:
+        condition &= Q(*(
+            Q(**{f'{field}__icontains': term}) for field in fields
+        ), _connector=Q.OR)
+    return condition
+
+
+def fallback_search(terms, kinds):
+    """Поиск через icontains для баз без FTS5: без ранжирования, но с тем
+    же форматом результатов."""
+    querysets = {
+        'title': Title.objects.filter(
+            contains_all(('name', 'description'), terms)
+        ).annotate(
+            kind=Value('title'),
+            object_id=F('id'),
+            title_ref=F('id'),
+            review_ref=Value(None, output_field=IntegerField()),
+            snippet=F('name'),
+        ),
+        'review': Review.objects.filter(
+            contains_all(('text',), terms)
+        ).annotate(
+            kind=Value('review'),
+            object_id=F('id'),
+            title_ref=F('title_id'),
+            review_ref=F('id'),
+            snippet=Substr('text', 1, 200),
+        ),
+        'comment': Comment.objects.filter(
+            contains_all(('text',), terms)
+        ).annotate(
+            kind=Value('comment'),
+            object_id=F('id'),
+            title_ref=F('review__title_id'),
+            review_ref=F('review_id'),
+            snippet=Substr('text', 1, 200),
+        ),
+    }
+    selected = [
+        querysets[kind]
+        .annotate(rank=Value(0.0, output_field=FloatField()))
+        .order_by()
+        .values(*RESULT_COLUMNS)
+        for kind in kinds
+    ]
+    return selected[0].union(*selected[1:], all=True).order_by(
+        'kind', '-object_id'
+    )
+
+
+def search(query, kinds=SEARCH_KINDS):
+    terms = parse_terms(query)
+    if not terms:
+        return []
+    using = router.db_for_read(Title) or 'default'
+    if has_fts5(connections[using]):
+        return FullTextResults(using, build_match(terms), kinds)
+    return fallback_search(terms, kinds)
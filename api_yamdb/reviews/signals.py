@@ -0,0 +1,73 @@
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_migrate,
+    post_save,
+)
+from django.dispatch import receiver
+
+from .models import Comment, Review, Title
+from .search import install_search_index
+from .utils import (
+    apply_sqlite_pragmas,
+    touch_reviews,
+    touch_titles,
+    update_title_rating,
+)
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            apply_sqlite_pragmas(cursor)
+
+
+@receiver(post_migrate)
+def create_search_index(sender, using, **kwargs):
+    if sender.name == 'reviews':
+        install_search_index(connections[using])
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, **kwargs):
+    old_score = getattr(instance, '_old_score', None)
+    if created:
+        update_title_rating(instance.title_id, added_score=instance.score)
+    elif old_score != instance.score:
+        update_title_rating(
+            instance.title_id,
+            added_score=instance.score,
+            removed_score=old_score,
+        )
+    else:
+        # Поле modified произведения - штамп списка его отзывов.
+        touch_titles([instance.title_id])
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    update_title_rating(instance.title_id, removed_score=instance.score)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    # Поле modified отзыва - штамп списка его комментариев.
+    touch_reviews([instance.review_id])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    # Жанры входят в ответ произведения, поэтому меняют его штамп.
+    # При очистке со стороны жанра id произведений известны только
+    # до удаления связей.
+    if not reverse and action in ('post_add', 'post_remove', 'post_clear'):
+        touch_titles([instance.pk])
+    elif reverse and action in ('post_add', 'post_remove'):
+        touch_titles(pk_set)
+    elif reverse and action == 'pre_clear':
+        touch_titles(instance.title_set.values('pk'))
@@ -0,0 +1,177 @@
+from array import array
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from heapq import nlargest
+from math import sqrt
+
+from django.db import connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import Review, SimilarTitle, Title
+from api_yamdb.settings import SIMILAR_MAX_USER_REVIEWS, SIMILAR_TITLES_COUNT
+
+# Разреженная матрица оценок в процессах пула. При запуске через fork
+# она не копируется, а наследуется от родительского процесса.
+_matrix = None
+
+
+class RatingMatrix:
+    """Разреженная матрица пользователь x произведение с оценками,
+    центрированными по средней оценке пользователя (adjusted cosine).
+    Строки хранятся в array, чтобы миллионы отзывов занимали десятки,
+    а не сотни мегабайт."""
+
+    def __init__(self, reviews):
+        by_user = defaultdict(list)
+        for author_id, title_id, score in reviews:
+            by_user[author_id].append((title_id, score))
+        by_title = defaultdict(lambda: (array('l'), array('d')))
+        self.user_titles = {}
+        self.user_scores = {}
+        for author_id, ratings in by_user.items():
+            mean = sum(score for _, score in ratings) / len(ratings)
+            titles = array('l', (title_id for title_id, _ in ratings))
+            scores = array('d', (score - mean for _, score in ratings))
+            self.user_titles[author_id] = titles
+            self.user_scores[author_id] = scores
+            for title_id, score in zip(titles, scores):
+                users, user_scores = by_title[title_id]
+                users.append(author_id)
+                user_scores.append(score)
+        self.title_users = dict(by_title)
+        self.norms = {
+            title_id: sqrt(sum(score * score for score in scores))
+            for title_id, (_, scores) in self.title_users.items()
+        }
+
+    def neighbors(self, title_id, count=None):
+        """Ближайшие по косинусу произведения: скалярные произведения
+        копятся только по пользователям, оценившим оба произведения."""
+        norm = self.norms.get(title_id)
+        if not norm:
+            return []
+        dots = defaultdict(float)
+        users, scores = self.title_users[title_id]
+        for author_id, score in zip(users, scores):
+            titles = self.user_titles[author_id]
+            if len(titles) > SIMILAR_MAX_USER_REVIEWS:
+                continue
+            for other_id, other_score in zip(
+                titles, self.user_scores[author_id]
+            ):
+                dots[other_id] += score * other_score
+        dots.pop(title_id, None)
+        return nlargest(
+            count or SIMILAR_TITLES_COUNT,
+            (
+                (dot / (norm * self.norms[other_id]), other_id)
+                for other_id, dot in dots.items()
+                if dot > 0 and self.norms[other_id]
+            ),
+        )
+
+    def co_rated(self, title_ids):
+        """Произведения, оцененные теми же пользователями."""
+        related = set()
+        for title_id in title_ids:
+            users, _ = self.title_users.get(title_id, ((), ()))
+            for author_id in users:
+                related.update(self.user_titles[author_id])
+        return related
+
+
+def _init_worker(matrix):
+    global _matrix
+    _matrix = matrix
+
+
+def _neighbors_chunk(title_ids):
+    return [(title_id, _matrix.neighbors(title_id)) for title_id in title_ids]
+
+
+def compute_neighbors(matrix, title_ids, workers=1, chunk_size=200):
+    """Считает соседей для `title_ids`, при workers > 1 в пуле
+    процессов пачками по `chunk_size` произведений."""
+    title_ids = sorted(title_ids)
+    if workers <= 1:
+        return [
+            (title_id, matrix.neighbors(title_id)) for title_id in title_ids
+        ]
+    chunks = [
+        title_ids[start:start + chunk_size]
+        for start in range(0, len(title_ids), chunk_size)
+    ]
+    # Дочерние процессы не работают с БД, но при fork наследуют ее
+    # соединения, поэтому они закрываются заранее.
+    connections.close_all()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(matrix,),
+    ) as pool:
+        return [
+            row
+            for rows in pool.map(_neighbors_chunk, chunks)
+            for row in rows
+        ]
+
+
+def get_changed_titles(matrix, since):
+    """Произведения, чьи строки в таблице соседей могли устареть после
+    `since`: изменившиеся (новые оценки меняют поле modified), все
+    оцененные теми же пользователями (меняются средние оценки
+    пользователей) и бывшие соседи изменившихся."""
+    changed = set(
+        Title.objects.filter(modified__gte=since).values_list(
+            'id', flat=True
+        )
+    )
+    affected = changed | matrix.co_rated(changed)
+    affected.update(
+        SimilarTitle.objects.filter(similar__in=changed).values_list(
+            'title_id', flat=True
+        )
+    )
+    return affected
+
+
+def refresh_similar_titles(incremental=False, workers=1):
+    """Пересчитывает списки похожих произведений и возвращает число
+    пересчитанных произведений."""
+    now = timezone.now()
+    matrix = RatingMatrix(
+        Review.objects.values_list('author_id', 'title_id', 'score')
+        .order_by()
+        .iterator()
+    )
+    last_computed = SimilarTitle.objects.aggregate(
+        last=Max('computed')
+    )['last']
+    if incremental and last_computed:
+        title_ids = get_changed_titles(matrix, last_computed)
+    else:
+        title_ids = set(Title.objects.values_list('id', flat=True))
+    rows = compute_neighbors(matrix, title_ids, workers)
+    entries = [
+        SimilarTitle(
+            title_id=title_id,
+            similar_id=similar_id,
+            score=score,
+            computed=now,
+        )
+        for title_id, neighbors in rows
+        for score, similar_id in neighbors
+    ]
+    with transaction.atomic():
+        if incremental and last_computed:
+            # Пачками, чтобы не упереться в лимит параметров запроса.
+            title_ids = sorted(title_ids)
+            for start in range(0, len(title_ids), 500):
+                SimilarTitle.objects.filter(
+                    title_id__in=title_ids[start:start + 500]
+                ).delete()
+        else:
+            SimilarTitle.objects.all().delete()
+        SimilarTitle.objects.bulk_create(entries, batch_size=500)
+    return len(title_ids)
@@ -0,0 +1,163 @@
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    FloatField,
+    Q,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import SCORE_FIELDS, Review, Title
+
+
+def rating_update(added_score=None, removed_score=None):
+    """Аргументы UPDATE, которые учитывают добавленную и/или убранную
+    оценку в сохраненном рейтинге и счетчиках оценок произведения."""
+    deltas = Counter()
+    if added_score is not None:
+        deltas[added_score] += 1
+    if removed_score is not None:
+        deltas[removed_score] -= 1
+    score_delta = sum(score * delta for score, delta in deltas.items())
+    count_delta = sum(deltas.values())
+    return {
+        **{
+            SCORE_FIELDS[score]: F(SCORE_FIELDS[score]) + delta
+            for score, delta in deltas.items()
+            if delta
+        },
+        'rating_sum': F('rating_sum') + score_delta,
+        'rating_count': F('rating_count') + count_delta,
+        'rating': Case(
+            When(rating_count=-count_delta, then=Value(None)),
+            default=(
+                (F('rating_sum') + score_delta)
+                * 1.0
+                / (F('rating_count') + count_delta)
+            ),
+            output_field=FloatField(),
+        ),
+        'modified': timezone.now(),
+    }
+
+
+def update_title_rating(title_id, added_score=None, removed_score=None):
+    """Обновляет рейтинг произведения одним UPDATE."""
+    Title.objects.filter(pk=title_id).update(
+        **rating_update(added_score, removed_score)
+    )
+
+
+def touch_titles(title_ids):
+    """Сдвигает поле modified произведений - штамп их версий для ETag
+    и Last-Modified - после записей в обход save()."""
+    Title.objects.filter(pk__in=title_ids).update(modified=timezone.now())
+
+
+def touch_reviews(review_ids):
+    """Сдвигает поле modified отзывов - штамп списков их комментариев."""
+    Review.objects.filter(pk__in=review_ids).update(
+        modified=timezone.now()
+    )
+
+
+def add_title_scores(scores):
+    """Учитывает по одной новой оценке для произведений из словаря
+    {id произведения: оценка}. Произведения с одинаковой оценкой
+    обновляются вместе, так что запросов не больше, чем значений
+    оценки."""
+    by_score = defaultdict(list)
+    for title_id, score in scores.items():
+        by_score[score].append(title_id)
+    for score, title_ids in by_score.items():
+        Title.objects.filter(pk__in=title_ids).update(
+            **rating_update(added_score=score)
+        )
+
+
+def get_stale_ratings():
+    """Возвращает произведения, чей сохраненный рейтинг расходится с
+    фактическими оценками в отзывах."""
+    titles = Title.objects.annotate(
+        actual_sum=Coalesce(Sum('reviews__score'), 0),
+        actual_count=Count('reviews'),
+        **{
+            f'actual_{field}': Count(
+                'reviews', filter=Q(reviews__score=score)
+            )
+            for score, field in SCORE_FIELDS.items()
+        },
+    ).only('id', 'rating_sum', 'rating_count', *SCORE_FIELDS.values())
+    return [
+        title
+        for title in titles
+        if (title.rating_sum, title.rating_count)
+        != (title.actual_sum, title.actual_count)
+        or any(
+            getattr(title, field) != getattr(title, f'actual_{field}')
+            for field in SCORE_FIELDS.values()
+        )
+    ]
+
+
+def rebuild_title_ratings(titles):
+    now = timezone.now()
+    for title in titles:
+        title.modified = now
+        title.rating_sum = title.actual_sum
+        title.rating_count = title.actual_count
+        title.rating = (
+            title.actual_sum / title.actual_count
+            if title.actual_count
+            else None
+        )
+        for field in SCORE_FIELDS.values():
+            setattr(title, field, getattr(title, f'actual_{field}'))
+    Title.objects.bulk_update(
+        titles,
+        (
+            'rating_sum',
+            'rating_count',
+            'rating',
+            'modified',
+            *SCORE_FIELDS.values(),
+        ),
+        batch_size=500,
+    )
+
+
+def get_histogram_stats(counts):
+    """Среднее и медиана по счетчикам {оценка: количество} без
+    перебора отдельных отзывов."""
+    total = sum(counts.values())
+    if not total:
+        return None, None
+    mean = sum(score * count for score, count in counts.items()) / total
+
+    def score_at(position):
+        seen = 0
+        for score in sorted(counts):
+            seen += counts[score]
+            if seen > position:
+                return score
+
+    return mean, (score_at((total - 1) // 2) + score_at(total // 2)) / 2
+
+
+def apply_sqlite_pragmas(cursor, pragmas=None):
+    """Настраивает соединение SQLite: WAL позволяет читать во время
+    записи, busy_timeout ждет блокировку вместо ошибки
+    "database is locked". Без `pragmas` настройки читаются из
+    SQLITE_PRAGMAS при каждом вызове, так что их можно переопределить
+    в настройках развертывания или через override_settings."""
+    if pragmas is None:
+        pragmas = settings.SQLITE_PRAGMAS
+    for pragma, value in pragmas.items():
+        cursor.execute(f'PRAGMA {pragma} = {value}')
@@ -0,0 +1,98 @@
+import os
+import random
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from reviews.leaderboards import refresh_leaderboards
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.recommendations import refresh_recommendations
+from reviews.similarity import refresh_similar_titles
+from reviews.utils import get_stale_ratings, rebuild_title_ratings
+
+BENCHMARK_SCALE = int(os.getenv('BENCHMARK_SCALE', 1))
+
+
+def seed_benchmark_dataset(scale, seed=0):
+    """Заполняет базу синтетическими данными, объем которых растет
+    линейно с `scale`. Идентификаторы задаются явно, чтобы bulk_create
+    работал одинаково на всех базах."""
+    rnd = random.Random(seed)
+    users_count = 20 * scale
+    titles_count = 50 * scale
+    User.objects.bulk_create(
+        User(
+            id=idx,
+            username=f'bench_user_{idx}',
+            email=f'bench_user_{idx}@yamdb.fake',
+            role={1: 'admin', 2: 'moderator'}.get(idx, 'user'),
+        )
+        for idx in range(1, users_count + 1)
+    )
+    Category.objects.bulk_create(
+        Category(id=idx, name=f'Категория {idx}', slug=f'bench-cat-{idx}')
+        for idx in range(1, 6)
+    )
+    Genre.objects.bulk_create(
+        Genre(id=idx, name=f'Жанр {idx}', slug=f'bench-genre-{idx}')
+        for idx in range(1, 11)
+    )
+    Title.objects.bulk_create(
+        Title(
+            id=idx,
+            name=f'Произведение {idx}',
+            year=rnd.randint(1950, 2020),
+            description=f'Описание произведения {idx}',
+            category_id=rnd.randint(1, 5),
+        )
+        for idx in range(1, titles_count + 1)
+    )
+    Title.genre.through.objects.bulk_create(
+        Title.genre.through(title_id=title_id, genre_id=genre_id)
+        for title_id in range(1, titles_count + 1)
+        for genre_id in rnd.sample(range(1, 11), 2)
+    )
+    now = timezone.now()
+    reviews = []
+    for title_id in range(1, titles_count + 1):
+        authors = rnd.sample(
+            range(1, users_count + 1), rnd.randint(0, users_count // 2)
+        )
+        for author_id in authors:
+            reviews.append(Review(
+                id=len(reviews) + 1,
+                title_id=title_id,
+                author_id=author_id,
+                text=f'Отзыв {len(reviews) + 1}',
+                score=rnd.randint(1, 10),
+                pub_date=now - timedelta(minutes=len(reviews)),
+            ))
+    Review.objects.bulk_create(reviews, batch_size=500)
+    Comment.objects.bulk_create(
+        (
+            Comment(
+                id=idx,
+                review_id=rnd.randint(1, len(reviews)),
+                author_id=rnd.randint(1, users_count),
+                text=f'Комментарий {idx}',
+            )
+            for idx in range(1, len(reviews) * 2 + 1)
+        ),
+        batch_size=500,
+    )
+    rebuild_title_ratings(get_stale_ratings())
+    refresh_leaderboards()
+    refresh_similar_titles()
+    refresh_recommendations()
+    return {
+        'scale': scale,
+        'users': users_count,
+        'titles': titles_count,
+        'reviews': len(reviews),
+    }
+
+
+@pytest.fixture
+def benchmark_dataset():
+    return seed_benchmark_dataset(BENCHMARK_SCALE)
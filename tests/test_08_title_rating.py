@@ -0,0 +1,81 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from reviews.models import Review, Title
+from reviews.utils import get_stale_ratings
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def test_01_rating_follows_reviews(self, admin_client, user_client,
+                                       moderator_client, client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        create_single_review(user_client, titles[0]['id'], 'text', 2)
+        review = create_single_review(
+            moderator_client, titles[0]['id'], 'text', 9
+        ).json()
+
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (11, 2), (
+            'Проверьте, что при создании отзыва обновляются сохраненные '
+            'сумма и количество оценок произведения.'
+        )
+        assert client.get(url).json()['rating'] == 5
+
+        response = moderator_client.patch(
+            f'{url}reviews/{review["id"]}/', data={'score': 4}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert client.get(url).json()['rating'] == 3, (
+            'Проверьте, что при изменении оценки в отзыве пересчитывается '
+            'рейтинг произведения.'
+        )
+
+        moderator_client.delete(f'{url}reviews/{review["id"]}/')
+        assert client.get(url).json()['rating'] == 2
+        Review.objects.filter(title_id=titles[0]['id']).delete()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            0, 0, None
+        ), (
+            'Проверьте, что после удаления всех отзывов рейтинг '
+            'произведения становится `None`.'
+        )
+
+    def test_02_rebuild_ratings_command(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'text', 7)
+        call_command('rebuild-ratings', check=True)
+
+        Title.objects.update(rating_sum=0, rating_count=0, rating=None)
+        with pytest.raises(CommandError):
+            call_command('rebuild-ratings', check=True)
+
+        call_command('rebuild-ratings')
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            7, 1, 7
+        )
+
+    def test_03_stale_instances(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        review_id = create_single_review(
+            user_client, titles[0]['id'], 'text', 10
+        ).json()['id']
+        first = Review.objects.get(pk=review_id)
+        second = Review.objects.get(pk=review_id)
+        first.score = 5
+        first.save()
+        second.score = 7
+        second.save()
+        assert not get_stale_ratings(), (
+            'Проверьте, что при изменении отзыва из рейтинга вычитается '
+            'оценка, сохраненная в БД, а не загруженная ранее.'
+        )
+        assert Title.objects.get(pk=titles[0]['id']).rating == 7
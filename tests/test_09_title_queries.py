@@ -0,0 +1,65 @@
+import pytest
+
+from api.serializers import TitleSerializer
+from api.views import TitleViewSet
+from reviews.models import Category, Genre, Title
+
+
+def create_catalog(size):
+    Category.objects.bulk_create(
+        Category(name=f'Категория {idx}', slug=f'category-{idx}')
+        for idx in range(3)
+    )
+    Genre.objects.bulk_create(
+        Genre(name=f'Жанр {idx}', slug=f'genre-{idx}') for idx in range(4)
+    )
+    categories = list(Category.objects.all())
+    genres = list(Genre.objects.all())
+    Title.objects.bulk_create(
+        Title(
+            name=f'Произведение {idx}',
+            year=2000,
+            category=categories[idx % len(categories)],
+        )
+        for idx in range(size)
+    )
+    Title.genre.through.objects.bulk_create(
+        Title.genre.through(title_id=title.id, genre_id=genre.id)
+        for idx, title in enumerate(Title.objects.all())
+        for genre in (genres[idx % 4], genres[(idx + 1) % 4])
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('size', (5, 50, 500))
+class Test09TitleQueries:
+
+    def test_01_title_list_queries(self, client, size,
+                                   django_assert_num_queries):
+        create_catalog(size)
+        # Штамп для ETag, COUNT пагинации, страница и жанры.
+        with django_assert_num_queries(4):
+            response = client.get('/api/v1/titles/')
+        assert len(response.json()['results']) == 5, (
+            'Проверьте, что список произведений по-прежнему пагинируется.'
+        )
+
+    def test_02_title_serialization_queries(self, size,
+                                            django_assert_num_queries):
+        create_catalog(size)
+        with django_assert_num_queries(2):
+            data = TitleSerializer(
+                TitleViewSet.queryset.all(), many=True
+            ).data
+        assert len(data) == size
+        assert all(len(title['genre']) == 2 for title in data), (
+            'Проверьте, что жанры произведений подгружаются через '
+            '`prefetch_related`.'
+        )
+
+    def test_03_title_detail_queries(self, client, size,
+                                     django_assert_num_queries):
+        create_catalog(size)
+        title = Title.objects.first()
+        with django_assert_num_queries(3):
+            client.get(f'/api/v1/titles/{title.id}/')
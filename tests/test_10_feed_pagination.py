@@ -0,0 +1,56 @@
+import pytest
+
+from tests.utils import create_reviews, create_single_comment
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10FeedPagination:
+
+    def test_01_comments_cursor_pagination(self, client, admin_client, admin,
+                                           user_client, user):
+        reviews, titles = create_reviews(admin_client, {user: user_client})
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            f'{reviews[0]["id"]}/comments/'
+        )
+        created = [
+            create_single_comment(
+                user_client, titles[0]['id'], reviews[0]['id'], f'text {idx}'
+            ).json()['id']
+            for idx in range(12)
+        ]
+
+        response = client.get(url)
+        assert 'count' in response.json(), (
+            'Проверьте, что без параметра `cursor` сохраняется постраничная '
+            'пагинация.'
+        )
+
+        seen = []
+        next_url = f'{url}?cursor='
+        while next_url:
+            data = client.get(next_url).json()
+            assert 'count' not in data
+            assert len(data['results']) <= 5
+            seen.extend(comment['id'] for comment in data['results'])
+            next_url = data['next']
+        assert seen == sorted(created, reverse=True), (
+            'Проверьте, что курсорная пагинация комментариев возвращает '
+            'каждый комментарий ровно один раз, от новых к старым.'
+        )
+
+    def test_02_reviews_cursor_pagination(self, client, admin_client, admin,
+                                          user_client, user, moderator,
+                                          moderator_client):
+        reviews, titles = create_reviews(
+            admin_client,
+            {admin: admin_client, user: user_client,
+             moderator: moderator_client}
+        )
+        data = client.get(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/?cursor='
+        ).json()
+        assert set(data) == {'next', 'previous', 'results'}
+        assert [review['id'] for review in data['results']] == sorted(
+            (review['id'] for review in reviews), reverse=True
+        )
@@ -0,0 +1,88 @@
+import csv
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+from reviews.models import Comment, Review, Title, User
+
+DATA_DIR = settings.BASE_DIR / 'static' / 'data'
+
+
+def count_rows(csv_file):
+    with open(DATA_DIR / f'{csv_file}.csv', encoding='utf-8') as stream:
+        return sum(1 for _ in csv.DictReader(stream))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11LoadCsv:
+
+    def test_01_load_all_files(self):
+        out = StringIO()
+        call_command('load-csv', batch_size=7, stdout=out)
+        assert User.objects.count() == count_rows('users')
+        assert Title.objects.count() == count_rows('titles')
+        assert Review.objects.count() == count_rows('review')
+        assert Comment.objects.count() == count_rows('comments')
+        assert 'строк/с' in out.getvalue()
+        call_command('rebuild-ratings', check=True, stdout=StringIO())
+
+    def test_02_reload_skips_existing_rows(self):
+        call_command('load-csv', stdout=StringIO())
+        out = StringIO()
+        call_command('load-csv', 'review', stdout=out)
+        assert Review.objects.count() == count_rows('review')
+        assert 'загружено строк 0' in out.getvalue()
+
+    def test_03_genre_title_keeps_all_genres(
+            self, django_assert_max_num_queries):
+        for csv_file in ('users', 'category', 'genre', 'titles'):
+            call_command('load-csv', csv_file, stdout=StringIO())
+        expected = {}
+        with open(DATA_DIR / 'genre_title.csv', encoding='utf-8') as stream:
+            for row in csv.DictReader(stream):
+                expected.setdefault(int(row['title_id']), set()).add(
+                    int(row['genre_id'])
+                )
+        assert any(len(genres) > 1 for genres in expected.values())
+
+        batches = -(-count_rows('genre_title') // 10)
+        # Две выборки идентификаторов, а на пакет - INSERT и UPDATE
+        # штампов произведений с savepoint.
+        with django_assert_max_num_queries(2 + 4 * batches):
+            call_command(
+                'load-csv', 'genre_title', batch_size=10, stdout=StringIO()
+            )
+        for title in Title.objects.prefetch_related('genre'):
+            assert {genre.id for genre in title.genre.all()} == (
+                expected.get(title.id, set())
+            ), (
+                'Проверьте, что загрузка genre_title не перезаписывает '
+                'жанры произведения, указанные в предыдущих строках.'
+            )
+
+    def test_04_genre_title_replace(self, tmp_path):
+        for csv_file in ('users', 'category', 'genre', 'titles',
+                         'genre_title'):
+            call_command('load-csv', csv_file, stdout=StringIO())
+        title = Title.objects.filter(genre__isnull=False).first()
+        genre_ids = sorted(title.genre.values_list('id', flat=True))
+        (tmp_path / 'genre_title.csv').write_text(
+            'id,title_id,genre_id\n'
+            f'1,{title.id},{genre_ids[0]}\n'
+            f'2,{title.id},{genre_ids[0]}\n',
+            encoding='utf-8',
+        )
+        call_command(
+            'load-csv', 'genre_title', data_dir=tmp_path, stdout=StringIO()
+        )
+        assert sorted(title.genre.values_list('id', flat=True)) == genre_ids
+
+        call_command(
+            'load-csv', 'genre_title', data_dir=tmp_path, batch_size=1,
+            replace_genres=True, stdout=StringIO()
+        )
+        assert list(title.genre.values_list('id', flat=True)) == (
+            genre_ids[:1]
+        )
@@ -0,0 +1,33 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12OwnProfile:
+
+    def test_01_get_is_read_only(self, user, user_client,
+                                 django_assert_num_queries):
+        user_client.get('/api/v1/users/me/')
+        # Остается только загрузка пользователя при аутентификации.
+        with django_assert_num_queries(1):
+            response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['username'] == user.username
+
+    def test_02_cache_invalidated_on_change(self, user, user_client,
+                                            admin_client):
+        user_client.get('/api/v1/users/me/')
+        user_client.patch('/api/v1/users/me/', data={'bio': 'new bio'})
+        assert user_client.get('/api/v1/users/me/').json()['bio'] == (
+            'new bio'
+        ), (
+            'Проверьте, что после PATCH-запроса к `/api/v1/users/me/` '
+            'GET-запрос возвращает обновленные данные.'
+        )
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'moderator'}
+        )
+        assert user_client.get('/api/v1/users/me/').json()['role'] == (
+            'moderator'
+        )
@@ -0,0 +1,53 @@
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+
+from reviews.models import OutgoingEmail
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13EmailOutbox:
+    url_signup = '/api/v1/auth/signup/'
+    valid_data = {'email': 'valid@yamdb.fake', 'username': 'valid_username'}
+
+    def test_01_signup_queues_single_email(self, client):
+        outbox_before_count = len(mail.outbox)
+        client.post(self.url_signup, data=self.valid_data)
+        client.post(self.url_signup, data=self.valid_data)
+        assert len(mail.outbox) == outbox_before_count, (
+            'Проверьте, что письмо с кодом подтверждения не отправляется '
+            'во время обработки запроса.'
+        )
+        assert OutgoingEmail.objects.count() == 1, (
+            'Проверьте, что повторная регистрация в течение окна '
+            'дедупликации не ставит в очередь второе письмо.'
+        )
+
+        call_command('send-emails', stdout=StringIO())
+        assert len(mail.outbox) == outbox_before_count + 1
+        assert mail.outbox[-1].to == [self.valid_data['email']]
+        call_command('send-emails', stdout=StringIO())
+        assert len(mail.outbox) == outbox_before_count + 1
+
+    def test_02_failed_email_is_retried(self, client, monkeypatch):
+        client.post(self.url_signup, data=self.valid_data)
+
+        def broken_send(self, *args, **kwargs):
+            raise ConnectionError('mail server is down')
+
+        with monkeypatch.context() as patch:
+            patch.setattr(
+                'django.core.mail.EmailMessage.send', broken_send
+            )
+            call_command('send-emails', stdout=StringIO())
+        email = OutgoingEmail.objects.get()
+        assert (email.attempts, email.sent_at) == (1, None)
+        assert 'mail server is down' in email.last_error
+
+        OutgoingEmail.objects.update(send_after=email.created)
+        call_command('send-emails', stdout=StringIO())
+        email.refresh_from_db()
+        assert email.sent_at is not None
+        assert email.attempts == 2
@@ -0,0 +1,54 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import StatelessJWTAuthentication, get_access_token
+from reviews.models import User
+
+
+def authenticate(method, token):
+    request = getattr(APIRequestFactory(), method)(
+        '/api/v1/titles/', HTTP_AUTHORIZATION=f'Bearer {token}'
+    )
+    user, _ = StatelessJWTAuthentication().authenticate(request)
+    return user
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14StatelessJWT:
+
+    def test_01_issued_token_contains_claims(self, client, admin):
+        response = client.post('/api/v1/auth/token/', data={
+            'username': admin.username,
+            'confirmation_code': default_token_generator.make_token(admin),
+        })
+        assert response.status_code == HTTPStatus.OK
+        token = AccessToken(response.json()['token'])
+        assert token['role'] == 'admin'
+        assert token['username'] == admin.username
+        assert token['is_superuser'] is False
+
+    def test_02_safe_methods_skip_user_lookup(self, admin,
+                                              django_assert_num_queries):
+        token = get_access_token(admin)
+        with django_assert_num_queries(0):
+            user = authenticate('get', token)
+        assert not isinstance(user, User)
+        assert user.pk == admin.pk
+        assert user.is_admin and not user.is_moderator
+
+        with django_assert_num_queries(1):
+            user = authenticate('post', token)
+        assert isinstance(user, User), (
+            'Проверьте, что для запросов на запись пользователь '
+            'загружается из базы данных.'
+        )
+
+    def test_03_tokens_without_claims_fall_back(self, user,
+                                                django_assert_num_queries):
+        with django_assert_num_queries(1):
+            authenticated = authenticate('get', AccessToken.for_user(user))
+        assert authenticated == user
@@ -0,0 +1,33 @@
+import pytest
+
+from reviews.models import Category, Genre
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15CatalogCache:
+
+    @pytest.mark.parametrize('url,model', (
+        ('/api/v1/genres/', Genre),
+        ('/api/v1/categories/', Category),
+    ))
+    def test_01_list_cached_until_change(self, client, admin_client, url,
+                                         model, django_assert_num_queries):
+        model.objects.create(name='Первый', slug='first')
+        client.get(url)
+        with django_assert_num_queries(0):
+            response = client.get(url)
+        assert response.json()['count'] == 1
+
+        assert client.get(f'{url}?search=Перв').json()['count'] == 1
+        assert client.get(f'{url}?search=нет').json()['count'] == 0, (
+            f'Проверьте, что кэш `{url}` учитывает параметр `search`.'
+        )
+
+        admin_client.post(url, data={'name': 'Второй', 'slug': 'second'})
+        assert client.get(url).json()['count'] == 2, (
+            f'Проверьте, что кэш `{url}` сбрасывается при создании записи.'
+        )
+        admin_client.delete(f'{url}second/')
+        assert client.get(url).json()['count'] == 1, (
+            f'Проверьте, что кэш `{url}` сбрасывается при удалении записи.'
+        )
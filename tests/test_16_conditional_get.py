@@ -0,0 +1,252 @@
+from datetime import datetime, timezone
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from rest_framework import viewsets
+
+from api.mixins import ConditionalGetMixin
+from reviews.models import Genre, Review, Title
+
+from tests.utils import (
+    create_reviews,
+    create_single_comment,
+    create_single_review,
+)
+
+PAST = datetime(2001, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16ConditionalGet:
+
+    def check_not_modified(self, client, url, django_assert_max_num_queries):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.has_header('ETag'), (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит ETag.'
+        )
+        with django_assert_max_num_queries(2):
+            response = client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным ETag '
+            'возвращает ответ со статусом 304.'
+        )
+        return response['ETag']
+
+    def test_01_titles(self, client, admin_client, user, user_client,
+                       django_assert_max_num_queries):
+        reviews, titles = create_reviews(admin_client, {user: user_client})
+        for url in ('/api/v1/titles/', f'/api/v1/titles/{titles[0]["id"]}/'):
+            etag = self.check_not_modified(
+                client, url, django_assert_max_num_queries
+            )
+            user_client.patch(
+                f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+                f'{reviews[0]["id"]}/',
+                data={'score': 1 if url.endswith('titles/') else 2},
+            )
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что изменение рейтинга меняет ETag `{url}`.'
+            )
+
+        etag = self.check_not_modified(
+            client, '/api/v1/titles/', django_assert_max_num_queries
+        )
+        admin_client.delete('/api/v1/genres/horror/')
+        response = client.get('/api/v1/titles/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение жанров меняет ETag списка произведений.'
+        )
+
+    def test_02_reviews_and_comments(self, client, admin_client, user,
+                                     user_client,
+                                     django_assert_max_num_queries):
+        reviews, titles = create_reviews(admin_client, {user: user_client})
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        create_single_comment(
+            user_client, titles[0]['id'], reviews[0]['id'], 'text'
+        )
+        for url in (reviews_url, comments_url):
+            etag = self.check_not_modified(
+                client, url, django_assert_max_num_queries
+            )
+            response = client.get(url, HTTP_IF_MODIFIED_SINCE=(
+                'Mon, 01 Jan 2001 00:00:00 GMT'
+            ))
+            assert response.status_code == HTTPStatus.OK
+        create_single_comment(
+            user_client, titles[0]['id'], reviews[0]['id'], 'text'
+        )
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+
+    def test_03_comment_lookups(self, client, admin_client, user,
+                                user_client, django_assert_num_queries):
+        reviews, titles = create_reviews(admin_client, {user: user_client})
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            f'{reviews[0]["id"]}/comments/'
+        )
+        create_single_comment(
+            user_client, titles[0]['id'], reviews[0]['id'], 'text'
+        )
+        # Отзыв, COUNT пагинации и страница комментариев: штамп для ETag -
+        # поле modified уже загруженного отзыва.
+        with django_assert_num_queries(3):
+            client.get(url)
+        wrong_url = url.replace(
+            f'titles/{titles[0]["id"]}/', f'titles/{titles[1]["id"]}/'
+        )
+        assert client.get(wrong_url).status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарии отзыва, не относящегося к '
+            'произведению из адреса, недоступны.'
+        )
+
+    def test_04_deletes_and_edits(self, client, admin_client, user,
+                                  user_client, moderator, moderator_client):
+        reviews, titles = create_reviews(
+            admin_client, {user: user_client, moderator: moderator_client}
+        )
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        response = client.get(url)
+        assert not response.has_header('Last-Modified'), (
+            'Проверьте, что Last-Modified не отдается, пока в той же '
+            'секунде возможны новые записи.'
+        )
+        Title.objects.filter(pk=title_id).update(modified=PAST)
+        response = client.get(url)
+        assert response.has_header('Last-Modified')
+        etag, last_modified = response['ETag'], response['Last-Modified']
+        assert client.get(
+            url, HTTP_IF_MODIFIED_SINCE=last_modified
+        ).status_code == HTTPStatus.NOT_MODIFIED
+
+        user_client.delete(f'{url}{reviews[0]["id"]}/')
+        for header in (
+            {'HTTP_IF_NONE_MATCH': etag},
+            {'HTTP_IF_MODIFIED_SINCE': last_modified},
+        ):
+            response = client.get(url, **header)
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что удаление отзыва меняет ETag и '
+                'Last-Modified списка отзывов.'
+            )
+            assert response.json()['count'] == 1
+
+        etag = client.get(url)['ETag']
+        moderator_client.patch(
+            f'{url}{reviews[1]["id"]}/', data={'text': 'Новый текст'}
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение текста отзыва меняет ETag списка.'
+        )
+
+        comments_url = f'{url}{reviews[1]["id"]}/comments/'
+        comment = create_single_comment(
+            user_client, title_id, reviews[1]['id'], 'text'
+        ).json()
+        etag = client.get(comments_url)['ETag']
+        user_client.delete(f'{comments_url}{comment["id"]}/')
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что удаление комментария меняет ETag списка.'
+        )
+
+        create_single_review(user_client, titles[1]['id'], 'text', 5)
+        Title.objects.update(modified=PAST)
+        Review.objects.update(modified=PAST)
+        etag = client.get('/api/v1/titles/')['ETag']
+        admin_client.delete(f'/api/v1/titles/{titles[1]["id"]}/')
+        response = client.get('/api/v1/titles/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что удаление произведения меняет ETag списка '
+            'произведений.'
+        )
+
+    def test_05_stamps_are_not_exposed(self, client, admin_client, user,
+                                       user_client):
+        reviews, titles = create_reviews(admin_client, {user: user_client})
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        response = admin_client.patch(title_url, data={'name': 'Новое'})
+        for data in (
+            response.json(),
+            client.get('/api/v1/titles/').json()['results'][0],
+            client.get(title_url).json(),
+            client.get(f'{title_url}reviews/').json()['results'][0],
+            client.get(f'{title_url}reviews/{reviews[0]["id"]}/').json(),
+        ):
+            assert 'modified' not in data, (
+                'Проверьте, что служебное поле `modified` не попадает в '
+                'ответы API.'
+            )
+
+    def test_06_writes_without_model_signals(self, client, admin_client,
+                                             user, user_client, tmp_path):
+        reviews, titles = create_reviews(admin_client, {user: user_client})
+        title = Title.objects.get(pk=titles[0]['id'])
+        url = f'/api/v1/titles/{title.id}/'
+        genre = Genre.objects.create(name='Новый', slug='new')
+        for change in (
+            lambda: title.genre.add(genre),
+            lambda: genre.title_set.remove(title),
+            lambda: genre.title_set.add(title),
+            lambda: genre.title_set.clear(),
+        ):
+            etag = client.get(url)['ETag']
+            change()
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что изменение жанров произведения меняет ETag '
+                'произведения.'
+            )
+
+        (tmp_path / 'genre_title.csv').write_text(
+            f'id,title_id,genre_id\n1,{title.id},{genre.id}\n',
+            encoding='utf-8',
+        )
+        for options in ({}, {'replace_genres': True}):
+            title.genre.remove(genre)
+            etag = client.get(url)['ETag']
+            call_command(
+                'load-csv', 'genre_title', data_dir=tmp_path,
+                stdout=StringIO(), **options
+            )
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что загрузка genre_title меняет ETag '
+                'произведения.'
+            )
+            assert 'new' in [
+                item['slug'] for item in response.json()['genre']
+            ]
+
+        comments_url = f'{url}reviews/{reviews[0]["id"]}/comments/'
+        etag = client.get(comments_url)['ETag']
+        (tmp_path / 'comments.csv').write_text(
+            'id,review_id,text,author,pub_date\n'
+            f'1,{reviews[0]["id"]},text,{user.id},2020-01-01T00:00:00Z\n',
+            encoding='utf-8',
+        )
+        call_command(
+            'load-csv', 'comments', data_dir=tmp_path, stdout=StringIO()
+        )
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что загрузка комментариев меняет ETag списка '
+            'комментариев отзыва.'
+        )
+        assert response.json()['count'] == 1
+
+    def test_07_list_stamps_required(self):
+        with pytest.raises(ImproperlyConfigured):
+            class NoStampsViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+                pass
@@ -0,0 +1,290 @@
+import gc
+import json
+import os
+import time
+import tracemalloc
+from http import HTTPStatus
+from pathlib import Path
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.urls import router_v1, urlpatterns
+from reviews.models import Comment, Review, Title, User
+
+BASELINE_PATH = Path(__file__).with_name('benchmark_baseline.json')
+BENCHMARK_RUNS = int(os.getenv('BENCHMARK_RUNS', 10))
+BENCHMARK_TOLERANCE = float(os.getenv('BENCHMARK_TOLERANCE', 3))
+BENCHMARK_UPDATE = os.getenv('BENCHMARK_UPDATE') == '1'
+# Абсолютный запас защищает от ложных срабатываний на очень быстрых
+# запросах, где шум сопоставим с самим измерением.
+LATENCY_SLACK_MS = 5
+MEMORY_SLACK_KB = 64
+# Отзывов в одном массовом запросе.
+BULK_SIZE = 2
+
+
+def make_client(user=None):
+    client = APIClient()
+    if user is not None:
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+        )
+    return client
+
+
+def get_routes(patterns):
+    """Все маршруты api/urls.py: префиксы viewset'ов роутера и имена
+    остальных маршрутов, включая вложенные через include()."""
+    router_names = {pattern.name for pattern in router_v1.urls}
+    routes = {prefix for prefix, _, _ in router_v1.registry}
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            routes |= get_routes(pattern.url_patterns)
+        elif pattern.name not in router_names:
+            routes.add(pattern.name)
+    return routes
+
+
+def get_endpoints(ctx):
+    """Описания запросов: имя, маршрут из api/urls.py, метод, адрес,
+    клиент, данные и ожидаемый статус. Адрес и данные могут зависеть
+    от номера прогона, чтобы запросы на создание не конфликтовали."""
+    title = f'/api/v1/titles/{ctx["title_id"]}'
+    review = f'{title}/reviews/{ctx["review_id"]}'
+    return (
+        ('titles-list', 'titles', 'get', '/api/v1/titles/', 'anon', None,
+         HTTPStatus.OK),
+        ('titles-list-filtered', 'titles', 'get',
+         '/api/v1/titles/?genre=bench-genre-1', 'anon', None,
+         HTTPStatus.OK),
+        ('titles-list-sparse', 'titles', 'get',
+         '/api/v1/titles/?fields=id,name,category', 'anon', None,
+         HTTPStatus.OK),
+        ('titles-detail', 'titles', 'get', f'{title}/', 'anon', None,
+         HTTPStatus.OK),
+        ('titles-histogram', 'titles', 'get', f'{title}/rating-histogram/',
+         'anon', None, HTTPStatus.OK),
+        ('titles-similar', 'titles', 'get', f'{title}/similar/', 'anon',
+         None, HTTPStatus.OK),
+        ('titles-create', 'titles', 'post', '/api/v1/titles/', 'admin',
+         lambda run: {
+             'name': f'Новое произведение {run}', 'year': 2000,
+             'genre': ['bench-genre-1'], 'category': 'bench-cat-1',
+         }, HTTPStatus.CREATED),
+        ('genres-list', 'genres', 'get', '/api/v1/genres/', 'anon', None,
+         HTTPStatus.OK),
+        ('categories-list', 'categories', 'get', '/api/v1/categories/',
+         'anon', None, HTTPStatus.OK),
+        ('reviews-list', r'titles/(?P<title_id>\d+)/reviews', 'get',
+         f'{title}/reviews/', 'anon', None, HTTPStatus.OK),
+        ('reviews-list-cursor', r'titles/(?P<title_id>\d+)/reviews', 'get',
+         f'{title}/reviews/?cursor=', 'anon', None, HTTPStatus.OK),
+        ('reviews-detail', r'titles/(?P<title_id>\d+)/reviews', 'get',
+         f'{review}/', 'anon', None, HTTPStatus.OK),
+        ('reviews-create', r'titles/(?P<title_id>\d+)/reviews', 'post',
+         lambda run: f'/api/v1/titles/{ctx["free_titles"][run]}/reviews/',
+         'admin', lambda run: {'text': 'Отзыв', 'score': 7},
+         HTTPStatus.CREATED),
+        ('reviews-bulk', 'reviews-bulk', 'post', '/api/v1/reviews/bulk/',
+         'user', lambda run: [
+             {'title': title_id, 'text': 'Отзыв', 'score': 7}
+             for title_id in ctx['user_free_titles'][
+                 run * BULK_SIZE:(run + 1) * BULK_SIZE
+             ]
+         ], HTTPStatus.CREATED),
+        ('comments-list',
+         r'titles/(?P<title_id>\d+)/reviews/(?P<review_id>\d+)/comments',
+         'get', f'{review}/comments/', 'anon', None, HTTPStatus.OK),
+        ('comments-detail',
+         r'titles/(?P<title_id>\d+)/reviews/(?P<review_id>\d+)/comments',
+         'get', f'{review}/comments/{ctx["comment_id"]}/', 'anon', None,
+         HTTPStatus.OK),
+        ('comments-create',
+         r'titles/(?P<title_id>\d+)/reviews/(?P<review_id>\d+)/comments',
+         'post', f'{review}/comments/', 'user',
+         lambda run: {'text': f'Комментарий {run}'}, HTTPStatus.CREATED),
+        ('users-list', 'users', 'get', '/api/v1/users/', 'admin', None,
+         HTTPStatus.OK),
+        ('users-detail', 'users', 'get', '/api/v1/users/bench_user_3/',
+         'admin', None, HTTPStatus.OK),
+        ('users-me', 'users', 'get', '/api/v1/users/me/', 'user', None,
+         HTTPStatus.OK),
+        ('users-recommendations', 'users', 'get',
+         '/api/v1/users/me/recommendations/', 'user', None, HTTPStatus.OK),
+        ('signup', 'signup', 'post', '/api/v1/auth/signup/', 'anon',
+         lambda run: {
+             'username': f'new_user_{run}',
+             'email': f'new_user_{run}@yamdb.fake',
+         }, HTTPStatus.OK),
+        ('token', 'get_token', 'post', '/api/v1/auth/token/', 'anon',
+         lambda run: {
+             'username': 'bench_user_3', 'confirmation_code': 'invalid',
+         }, HTTPStatus.BAD_REQUEST),
+        ('leaderboards', 'leaderboards', 'get',
+         '/api/v1/leaderboards/rating/?category=bench-cat-1', 'anon', None,
+         HTTPStatus.OK),
+        ('export', 'export', 'get', '/api/v1/export/reviews.ndjson',
+         'admin', None, HTTPStatus.OK),
+        ('search', 'search', 'get', '/api/v1/search/?q=Отзыв', 'anon', None,
+         HTTPStatus.OK),
+    )
+
+
+def run_request(client, method, url, data):
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        # Список в теле запроса не кодируется в multipart.
+        response = getattr(client, method)(
+            url, data=data, format='json' if isinstance(data, list) else None
+        )
+        if response.streaming:
+            # Выгрузка читает базу только при чтении тела ответа.
+            b''.join(response.streaming_content)
+        elapsed = time.perf_counter() - started
+    return response, len(queries.captured_queries), elapsed * 1000
+
+
+def resolve(value, run):
+    return value(run) if callable(value) else value
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[round(share * (len(values) - 1))]
+
+
+def measure(client, method, url, data, expected_status):
+    timings = []
+    queries = 0
+    # Полная сборка мусора посреди замера дает выброс в десятки
+    # миллисекунд, который попадает в p95 случайного маршрута.
+    gc.collect()
+    gc.disable()
+    try:
+        for run in range(BENCHMARK_RUNS + 1):
+            response, run_queries, elapsed = run_request(
+                client, method, resolve(url, run), resolve(data, run)
+            )
+            assert response.status_code == expected_status, (
+                f'{method.upper()} {url} вернул {response.status_code}: '
+                f'{response.content[:200]}'
+            )
+            queries = max(queries, run_queries)
+            timings.append(elapsed)
+    finally:
+        gc.enable()
+    run = BENCHMARK_RUNS + 1
+    tracemalloc.start()
+    try:
+        run_request(client, method, resolve(url, run), resolve(data, run))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'queries': queries,
+        'p50_ms': round(percentile(timings, 0.5), 2),
+        'p95_ms': round(percentile(timings, 0.95), 2),
+        'memory_kb': round(peak / 1024, 1),
+    }
+
+
+def find_regressions(name, result, baseline):
+    regressions = []
+    if result['queries'] > baseline['queries']:
+        regressions.append(
+            f'{name}: запросов к БД {result["queries"]}, '
+            f'в эталоне {baseline["queries"]}'
+        )
+    latency_limit = (
+        baseline['p95_ms'] * BENCHMARK_TOLERANCE + LATENCY_SLACK_MS
+    )
+    if result['p95_ms'] > latency_limit:
+        regressions.append(
+            f'{name}: p95 {result["p95_ms"]} мс, '
+            f'допустимо {latency_limit:.2f} мс'
+        )
+    memory_limit = (
+        baseline['memory_kb'] * BENCHMARK_TOLERANCE + MEMORY_SLACK_KB
+    )
+    if result['memory_kb'] > memory_limit:
+        regressions.append(
+            f'{name}: память {result["memory_kb"]} КБ, '
+            f'допустимо {memory_limit:.1f} КБ'
+        )
+    return regressions
+
+
+@pytest.mark.django_db
+class Test17Benchmarks:
+
+    def test_01_endpoints_do_not_regress(self, benchmark_dataset):
+        admin = User.objects.get(username='bench_user_1')
+        user = User.objects.get(username='bench_user_3')
+        review = Review.objects.filter(comments__isnull=False).first()
+        ctx = {
+            'title_id': review.title_id,
+            'review_id': review.id,
+            'comment_id': review.comments.first().id,
+            'free_titles': list(
+                Title.objects.exclude(reviews__author=admin)
+                .values_list('id', flat=True)
+            ),
+            'user_free_titles': list(
+                Title.objects.exclude(reviews__author=user)
+                .values_list('id', flat=True)
+            ),
+        }
+        assert len(ctx['free_titles']) > BENCHMARK_RUNS + 1
+        assert len(ctx['user_free_titles']) >= (
+            (BENCHMARK_RUNS + 2) * BULK_SIZE
+        )
+        assert Comment.objects.exists()
+        clients = {
+            'anon': make_client(),
+            'user': make_client(user),
+            'admin': make_client(admin),
+        }
+        endpoints = get_endpoints(ctx)
+
+        covered = {route for _, route, *_ in endpoints}
+        registered = get_routes(urlpatterns)
+        assert registered <= covered, (
+            f'Добавьте в бенчмарк маршруты: {registered - covered}'
+        )
+
+        results = {
+            name: measure(clients[client], method, url, data, status)
+            for name, _, method, url, client, data, status in endpoints
+        }
+        baselines = (
+            json.loads(BASELINE_PATH.read_text(encoding='utf-8'))
+            if BASELINE_PATH.exists()
+            else {}
+        )
+        scale = str(benchmark_dataset['scale'])
+        if BENCHMARK_UPDATE:
+            baselines[scale] = results
+            BASELINE_PATH.write_text(
+                json.dumps(baselines, indent=2, sort_keys=True) + '\n',
+                encoding='utf-8',
+            )
+            return
+        if scale not in baselines:
+            pytest.skip(
+                f'Нет эталона для BENCHMARK_SCALE={scale}; запустите '
+                'с BENCHMARK_UPDATE=1, чтобы его записать.'
+            )
+        regressions = [
+            regression
+            for name, result in results.items()
+            if name in baselines[scale]
+            for regression in find_regressions(
+                name, result, baselines[scale][name]
+            )
+        ]
+        assert not regressions, '\n'.join(regressions)
@@ -0,0 +1,44 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Comment, Review, Title, User
+
+SIZES = {
+    'users': 30, 'titles': 20, 'genres': 5, 'categories': 3,
+    'reviews': 200, 'comments': 300,
+}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18GenerateDataset:
+
+    def test_01_csv_is_deterministic(self, tmp_path):
+        for name, seed in (('first', 1), ('second', 1), ('other', 2)):
+            call_command(
+                'generate-dataset', output_dir=tmp_path / name, seed=seed,
+                stdout=StringIO(), **SIZES
+            )
+        for csv_file in ('users', 'titles', 'review', 'comments'):
+            first = (tmp_path / 'first' / f'{csv_file}.csv').read_text()
+            second = (tmp_path / 'second' / f'{csv_file}.csv').read_text()
+            assert first == second, (
+                'Проверьте, что generate-dataset с одинаковым `--seed` '
+                f'создает одинаковый файл {csv_file}.csv.'
+            )
+        assert (tmp_path / 'first' / 'review.csv').read_text() != (
+            tmp_path / 'other' / 'review.csv'
+        ).read_text()
+
+    def test_02_load_into_database(self):
+        call_command('generate-dataset', stdout=StringIO(), **SIZES)
+        assert User.objects.count() == SIZES['users']
+        assert Title.objects.count() == SIZES['titles']
+        assert Review.objects.count() == SIZES['reviews']
+        assert Comment.objects.count() == SIZES['comments']
+        assert Review.objects.filter(pub_date__year__lt=2023).exists(), (
+            'Проверьте, что даты публикации из набора данных сохраняются '
+            'при загрузке.'
+        )
+        call_command('rebuild-ratings', check=True, stdout=StringIO())
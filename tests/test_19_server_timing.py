@@ -0,0 +1,50 @@
+import logging
+
+import pytest
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19ServerTiming:
+
+    def test_01_disabled_by_default(self, client):
+        response = client.get('/api/v1/titles/')
+        assert not response.has_header('Server-Timing')
+
+    @override_settings(SQL_TIMING_ENABLED=True)
+    def test_02_server_timing_header(self):
+        response = APIClient().get('/api/v1/titles/')
+        header = response['Server-Timing']
+        for metric in ('db;', 'view;', 'serialize;', 'render;', 'total;'):
+            assert metric in header, (
+                f'Проверьте, что заголовок Server-Timing содержит `{metric}`.'
+            )
+        assert 'queries' in header
+
+    @override_settings(
+        SQL_TIMING_ENABLED=True, SQL_TIMING_QUERY_THRESHOLD=0
+    )
+    def test_03_slow_request_logged(self, caplog):
+        with caplog.at_level(logging.WARNING, logger='api.middleware'):
+            APIClient().get('/api/v1/titles/')
+        assert 'reviews_title' in caplog.text, (
+            'Проверьте, что запрос, превысивший порог числа запросов к БД, '
+            'попадает в лог вместе с SQL.'
+        )
+
+    @override_settings(SQL_TIMING_ENABLED=True)
+    def test_04_serialization_timed(self, admin_client):
+        for idx in range(3):
+            admin_client.post('/api/v1/genres/', data={
+                'name': f'Жанр {idx}', 'slug': f'genre-{idx}'
+            })
+        header = APIClient().get('/api/v1/genres/')['Server-Timing']
+        metrics = dict(
+            metric.split(';dur=') for metric in header.split(', ')
+            if ';dur=' in metric
+        )
+        assert float(metrics['serialize'].split(';')[0]) > 0, (
+            'Проверьте, что время сериализации замеряется отдельно от '
+            'времени представления.'
+        )
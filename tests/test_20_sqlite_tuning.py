@@ -0,0 +1,42 @@
+import sqlite3
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from reviews.utils import apply_sqlite_pragmas
+
+
+@pytest.mark.django_db
+class Test20SqliteTuning:
+
+    def test_01_pragmas_applied_to_connections(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            assert cursor.fetchone()[0] == 1, (
+                'Проверьте, что для соединений SQLite устанавливается '
+                '`synchronous = NORMAL`.'
+            )
+            cursor.execute('PRAGMA busy_timeout')
+            assert cursor.fetchone()[0] == 5000
+
+    def test_02_pragmas_follow_settings(self, settings):
+        settings.SQLITE_PRAGMAS = {'busy_timeout': 1234}
+        cursor = sqlite3.connect(':memory:').cursor()
+        apply_sqlite_pragmas(cursor)
+        cursor.execute('PRAGMA busy_timeout')
+        assert cursor.fetchone()[0] == 1234, (
+            'Проверьте, что SQLITE_PRAGMAS читаются из настроек при '
+            'настройке соединения, а не при импорте.'
+        )
+
+    def test_03_concurrency_benchmark(self):
+        out = StringIO()
+        call_command(
+            'sqlite-concurrency', writers=1, readers=1, seconds=0.2,
+            rows=100, stdout=out
+        )
+        lines = out.getvalue().splitlines()
+        assert len(lines) == 2
+        assert lines[1].startswith('SQLITE_PRAGMAS')
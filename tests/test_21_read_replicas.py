@@ -0,0 +1,167 @@
+import json
+import sqlite3
+from http import HTTPStatus
+
+import pytest
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from api.db_routers import (
+    ReplicaRouter,
+    ReplicaRoutingMiddleware,
+    current_replica,
+)
+from reviews.models import Title, User
+
+
+def routed_alias(request, with_response=False):
+    seen = []
+
+    def get_response(request):
+        seen.append(current_replica.get())
+        return HttpResponse()
+
+    response = ReplicaRoutingMiddleware(get_response)(request)
+    return (seen[0], response) if with_response else seen[0]
+
+
+@pytest.fixture(autouse=True)
+def replicas(settings):
+    settings.REPLICA_DATABASES = ['replica_1', 'replica_2']
+    settings.REPLICA_SELECTION = 'round_robin'
+
+
+@pytest.fixture
+def sqlite_replica(tmp_path):
+    """Отдельный файл SQLite с копией тестовой базы, которая дальше
+    не синхронизируется с основной."""
+    alias = 'replica_sqlite'
+    path = tmp_path / 'replica.sqlite3'
+    Title.objects.create(name='На реплике', year=2000)
+    primary = connections['default']
+    primary.ensure_connection()
+    with sqlite3.connect(path) as replica:
+        primary.connection.backup(replica)
+    connections.databases[alias] = {
+        'ENGINE': 'django.db.backends.sqlite3', 'NAME': str(path)
+    }
+    yield alias
+    connections[alias].close()
+    del connections[alias]
+    del connections.databases[alias]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21ReadReplicas:
+
+    def test_01_router_uses_request_replica(self):
+        router = ReplicaRouter()
+        assert router.db_for_read(Title) is None, (
+            'Проверьте, что вне запроса чтение идет в основную базу.'
+        )
+        token = current_replica.set('replica_1')
+        try:
+            assert router.db_for_read(Title) == 'replica_1'
+            assert router.db_for_read(User) is None, (
+                'Проверьте, что пользователи всегда читаются из основной '
+                'базы.'
+            )
+            assert router.db_for_write(Title) == 'default'
+        finally:
+            current_replica.reset(token)
+        assert not router.allow_migrate('replica_1', 'reviews')
+
+    def test_02_round_robin(self):
+        factory = RequestFactory()
+        aliases = {
+            routed_alias(factory.get('/api/v1/titles/', REMOTE_ADDR=ip))
+            for ip in ('10.0.0.1', '10.0.0.2', '10.0.0.3')
+        }
+        assert aliases == {'replica_1', 'replica_2'}, (
+            'Проверьте, что безопасные запросы распределяются по репликам.'
+        )
+
+    def test_03_writes_pin_client_to_primary(self, settings):
+        factory = RequestFactory()
+        alias, response = routed_alias(
+            factory.post('/api/v1/titles/'), with_response=True
+        )
+        assert alias is None
+        pinned = RequestFactory()
+        pinned.cookies[settings.REPLICA_PIN_COOKIE] = response.cookies[
+            settings.REPLICA_PIN_COOKIE
+        ].value
+        assert routed_alias(pinned.get('/api/v1/titles/')) is None, (
+            'Проверьте, что после записи клиент читает из основной базы.'
+        )
+        assert routed_alias(factory.get('/api/v1/titles/')) is not None, (
+            'Проверьте, что закрепление не затрагивает других клиентов.'
+        )
+        forged = RequestFactory()
+        forged.cookies[settings.REPLICA_PIN_COOKIE] = '1'
+        assert routed_alias(forged.get('/api/v1/titles/')) is not None, (
+            'Проверьте, что закрепление хранится в подписанной cookie.'
+        )
+        settings.REPLICA_PIN_SECONDS = 0
+        assert routed_alias(pinned.get('/api/v1/titles/')) is not None, (
+            'Проверьте, что закрепление истекает через '
+            '`REPLICA_PIN_SECONDS`.'
+        )
+
+    def test_04_least_loaded(self, settings):
+        settings.REPLICA_SELECTION = 'least_loaded'
+        factory = RequestFactory()
+        inner = []
+
+        def get_response(request):
+            inner.append(current_replica.get())
+            return HttpResponse()
+
+        def outer_response(request):
+            inner.append(current_replica.get())
+            ReplicaRoutingMiddleware(get_response)(
+                factory.get('/api/v1/genres/', REMOTE_ADDR='10.0.0.7')
+            )
+            return HttpResponse()
+
+        ReplicaRoutingMiddleware(outer_response)(
+            factory.get('/api/v1/titles/', REMOTE_ADDR='10.0.0.6')
+        )
+        assert inner[0] != inner[1], (
+            'Проверьте, что запрос уходит на наименее загруженную реплику.'
+        )
+
+    def test_05_api_reads_through_replica(self, settings, sqlite_replica,
+                                          admin_client):
+        settings.REPLICA_DATABASES = [sqlite_replica]
+        Title.objects.create(name='Только в основной базе', year=2000)
+        response = admin_client.get('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.OK
+        assert [title['name'] for title in response.json()['results']] == [
+            'На реплике'
+        ], 'Проверьте, что список произведений читается из реплики.'
+
+        response = admin_client.post('/api/v1/genres/', data={
+            'name': 'Новый', 'slug': 'new'
+        })
+        assert response.status_code == HTTPStatus.CREATED
+        response = admin_client.get('/api/v1/titles/')
+        assert response.json()['count'] == 2, (
+            'Проверьте, что после записи клиент читает из основной базы.'
+        )
+
+    def test_06_export_reads_through_replica(self, settings, sqlite_replica,
+                                             admin_client):
+        settings.REPLICA_DATABASES = [sqlite_replica]
+        Title.objects.create(name='Только в основной базе', year=2000)
+        response = admin_client.get('/api/v1/export/titles.ndjson')
+        assert response.status_code == HTTPStatus.OK
+        rows = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).splitlines()
+        ]
+        assert [row['name'] for row in rows] == ['На реплике'], (
+            'Проверьте, что выгрузка читается из реплики, хотя ответ '
+            'отдается потоком после выхода из middleware.'
+        )
@@ -0,0 +1,67 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+
+
+@pytest.fixture
+def catalog():
+    film = Category.objects.create(name='Фильм', slug='film')
+    book = Category.objects.create(name='Книга', slug='book')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    Genre.objects.create(name='Драмеди', slug='dramedy')
+    both = Title.objects.create(name='Обе', year=1990, category=film)
+    both.genre.set([drama, comedy])
+    old = Title.objects.create(name='Старая', year=1950, category=book)
+    old.genre.set([drama])
+    new = Title.objects.create(name='Новая', year=2020, category=film)
+    new.genre.set([comedy])
+    return {'both': both.id, 'old': old.id, 'new': new.id}
+
+
+def title_ids(client, query):
+    response = client.get(f'/api/v1/titles/?{query}')
+    return [title['id'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22TitleFilters:
+
+    def test_01_genre_exact(self, client, catalog):
+        assert sorted(title_ids(client, 'genre=drama')) == sorted(
+            [catalog['both'], catalog['old']]
+        ), 'Проверьте, что фильтр по жанру сравнивает slug целиком.'
+        assert title_ids(client, 'genre=dram') == [], (
+            'Проверьте, что фильтр по жанру не ищет по части slug.'
+        )
+
+    def test_02_multiple_genres_without_duplicates(self, client, catalog):
+        ids = title_ids(client, 'genre=drama,comedy')
+        assert sorted(ids) == sorted(catalog.values()), (
+            'Проверьте, что произведение с несколькими подходящими жанрами '
+            'возвращается один раз.'
+        )
+        with CaptureQueriesContext(connection) as queries:
+            client.get('/api/v1/titles/?genre=drama,comedy')
+        sql = ' '.join(query['sql'] for query in queries.captured_queries)
+        assert 'EXISTS' in sql and 'LIKE' not in sql, (
+            'Проверьте, что фильтр по жанрам использует EXISTS и точное '
+            'сравнение slug.'
+        )
+
+    def test_03_category(self, client, catalog):
+        assert sorted(title_ids(client, 'category=film')) == sorted(
+            [catalog['both'], catalog['new']]
+        )
+        assert title_ids(client, 'category=fil') == []
+        assert len(title_ids(client, 'category=film,book')) == 3
+
+    def test_04_year_range(self, client, catalog):
+        assert title_ids(client, 'year_min=1960&year_max=2000') == [
+            catalog['both']
+        ], 'Проверьте фильтры `year_min` и `year_max`.'
+        assert sorted(title_ids(client, 'year_min=1990')) == sorted(
+            [catalog['both'], catalog['new']]
+        )
@@ -0,0 +1,98 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews import search
+from reviews.models import Category, Comment, Review, Title
+
+
+@pytest.fixture
+def library(user):
+    category = Category.objects.create(name='Книга', slug='book')
+    main = Title.objects.create(
+        name='Солярис', year=1961, category=category,
+        description='Роман о планете-океане',
+    )
+    other = Title.objects.create(
+        name='Пикник на обочине', year=1972, category=category,
+        description='Повесть, которую сравнивают с Солярис',
+    )
+    review = Review.objects.create(
+        title=other, author=user, score=9, text='Сильнее, чем Солярис'
+    )
+    comment = Comment.objects.create(
+        review=review, author=user, text='Согласен насчет Соляриса'
+    )
+    return {
+        'main': main, 'other': other, 'review': review, 'comment': comment,
+    }
+
+
+def found(client, query):
+    response = client.get(f'/api/v1/search/?{query}')
+    assert response.status_code == HTTPStatus.OK, response.content
+    return [(item['type'], item['id']) for item in response.json()['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Search:
+
+    def test_01_ranked_results(self, client, library):
+        results = found(client, 'q=солярис')
+        assert results[0] == ('title', library['main'].id), (
+            'Проверьте, что совпадение в названии ранжируется выше '
+            'совпадения в описании.'
+        )
+        assert set(results) == {
+            ('title', library['main'].id),
+            ('title', library['other'].id),
+            ('review', library['review'].id),
+            ('comment', library['comment'].id),
+        }, 'Проверьте поиск по произведениям, отзывам и комментариям.'
+        item = client.get('/api/v1/search/?q=сильнее').json()['results'][0]
+        assert item['title_id'] == library['other'].id
+        assert item['review_id'] == library['review'].id
+        assert '<mark>' in item['snippet']
+
+    def test_02_pagination_and_type(self, client, library):
+        response = client.get('/api/v1/search/?q=солярис')
+        assert response.json()['count'] == 4
+        assert set(found(client, 'q=солярис&type=review,comment')) == {
+            ('review', library['review'].id),
+            ('comment', library['comment'].id),
+        }, 'Проверьте фильтр по типу результатов.'
+        response = client.get('/api/v1/search/?q=солярис&type=user')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.get('/api/v1/search/')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что без параметра `q` возвращается 400.'
+        )
+
+    def test_03_index_follows_changes(self, client, library):
+        library['review'].text = 'Текст изменен'
+        library['review'].save()
+        library['comment'].delete()
+        assert found(client, 'q=солярис&type=review,comment') == [], (
+            'Проверьте, что индекс обновляется при изменении и удалении.'
+        )
+        assert found(client, 'q=изменен&type=review') == [
+            ('review', library['review'].id)
+        ]
+
+    def test_04_query_syntax_is_escaped(self, client, library):
+        for query in ('"', 'NEAR(', 'солярис OR', '*', '-:^'):
+            response = client.get('/api/v1/search/', {'q': query})
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что запрос `{query}` не ломает поиск.'
+            )
+
+    def test_05_fallback(self, client, library, monkeypatch):
+        monkeypatch.setattr(search, 'has_fts5', lambda connection: False)
+        # LIKE в SQLite не сворачивает регистр кириллицы.
+        assert set(found(client, 'q=Солярис')) >= {
+            ('title', library['main'].id),
+            ('review', library['review'].id),
+        }, 'Проверьте поиск без FTS5.'
+        assert client.get(
+            '/api/v1/search/?q=Солярис'
+        ).json()['count'] == 4
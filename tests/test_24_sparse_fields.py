@@ -0,0 +1,98 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments, create_reviews
+
+
+def get_with_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, response.content
+    return response.json(), [query['sql'] for query in queries]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24SparseFields:
+
+    def test_01_title_fields(self, client, admin_client, user, user_client):
+        create_reviews(admin_client, {user: user_client})
+        data, queries = get_with_queries(
+            client, '/api/v1/titles/?fields=id,name'
+        )
+        assert set(data['results'][0]) == {'id', 'name'}, (
+            'Проверьте, что параметр `fields` ограничивает поля ответа.'
+        )
+        page_query = next(sql for sql in queries if 'LIMIT' in sql)
+        assert 'description' not in page_query, (
+            'Проверьте, что ненужные колонки не читаются из БД.'
+        )
+        assert 'reviews_category' not in page_query
+        assert not any('reviews_genre' in sql for sql in queries), (
+            'Проверьте, что жанры не подгружаются, если их нет в `fields`.'
+        )
+
+    def test_02_title_expand(self, client, admin_client, user, user_client):
+        create_reviews(admin_client, {user: user_client})
+        data, _ = get_with_queries(
+            client, '/api/v1/titles/?fields=id,category,genre'
+        )
+        title = data['results'][0]
+        assert isinstance(title['category'], str), (
+            'Проверьте, что без `expand` связь отдается slug.'
+        )
+        assert all(isinstance(genre, str) for genre in title['genre'])
+        data, _ = get_with_queries(
+            client, '/api/v1/titles/?fields=id,category,genre&expand=genre'
+        )
+        title = data['results'][0]
+        assert isinstance(title['category'], str)
+        assert set(title['genre'][0]) == {'name', 'slug'}, (
+            'Проверьте, что `expand` раскрывает связь во вложенный объект.'
+        )
+        data, _ = get_with_queries(client, f'/api/v1/titles/{title["id"]}/')
+        assert set(data['category']) == {'name', 'slug'}, (
+            'Проверьте, что без параметров ответ не изменился.'
+        )
+
+    def test_03_review_and_comment(self, client, admin_client, user,
+                                   user_client):
+        _, reviews, titles = create_comments(
+            admin_client, {user: user_client}
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data, _ = get_with_queries(client, f'{url}?expand=author')
+        assert data['results'][0]['author']['username'] == user.username, (
+            'Проверьте, что `expand=author` раскрывает автора отзыва.'
+        )
+        assert set(data['results'][0]['author']) == {'username'}, (
+            'Проверьте, что раскрытый автор содержит только публичные '
+            'поля.'
+        )
+        data, queries = get_with_queries(
+            client, f'{url}?fields=id,score&cursor='
+        )
+        assert set(data['results'][0]) == {'id', 'score'}
+        assert len(queries) <= 3, (
+            'Проверьте, что курсорная пагинация не подгружает отложенные '
+            'поля отдельными запросами.'
+        )
+        data, _ = get_with_queries(
+            client,
+            f'{url}{reviews[0]["id"]}/comments/?fields=text,author'
+            '&expand=author',
+        )
+        comment = data['results'][0]
+        assert set(comment) == {'text', 'author'}
+        assert comment['author']['username'] == user.username
+
+    def test_04_unknown_fields(self, client, admin_client, user,
+                               user_client):
+        create_reviews(admin_client, {user: user_client})
+        for query in ('fields=id,secret', 'expand=name'):
+            response = client.get(f'/api/v1/titles/?{query}')
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что `{query}` возвращает ответ со статусом 400.'
+            )
@@ -0,0 +1,76 @@
+import csv
+import json
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+from api import exports
+from reviews.models import Comment, Review
+from tests.utils import create_comments
+
+
+def read_stream(response):
+    assert response.status_code == HTTPStatus.OK, response
+    assert response.streaming, (
+        'Проверьте, что выгрузка отдается потоком `StreamingHttpResponse`.'
+    )
+    return b''.join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25Export:
+
+    def test_01_admin_only(self, client, user_client):
+        for api_client in (client, user_client):
+            response = api_client.get('/api/v1/export/titles.ndjson')
+            assert response.status_code in (
+                HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN
+            ), 'Проверьте, что выгрузка доступна только администратору.'
+
+    def test_02_titles_ndjson(self, admin_client, user, user_client,
+                              monkeypatch, django_assert_max_num_queries):
+        create_comments(admin_client, {user: user_client})
+        monkeypatch.setattr(exports, 'EXPORT_CHUNK_SIZE', 1)
+        response = admin_client.get('/api/v1/export/titles.ndjson')
+        # Две пачки по одному произведению и пустая: запрос произведений
+        # и запрос жанров на каждую непустую пачку.
+        with django_assert_max_num_queries(5):
+            rows = [
+                json.loads(line)
+                for line in read_stream(response).splitlines()
+            ]
+        assert len(rows) == 2
+        assert set(rows[0]) == set(exports.EXPORT_FIELDS['titles'])
+        assert rows[0]['category'] and rows[0]['genre'], (
+            'Проверьте, что выгрузка произведений содержит категорию и '
+            'жанры.'
+        )
+        assert any(row['rating'] is not None for row in rows)
+
+    def test_03_reviews_csv(self, admin_client, user, user_client):
+        create_comments(admin_client, {user: user_client})
+        response = admin_client.get('/api/v1/export/reviews.csv')
+        assert response['Content-Type'].startswith('text/csv')
+        rows = list(csv.DictReader(read_stream(response).splitlines()))
+        assert len(rows) == Review.objects.count()
+        assert rows[0]['author'] == user.username
+
+    def test_04_since(self, admin_client, user, user_client):
+        create_comments(admin_client, {user: user_client})
+        since = timezone.now()
+        Comment.objects.update(pub_date=since - timezone.timedelta(days=1))
+        newest = Comment.objects.first()
+        Comment.objects.filter(pk=newest.pk).update(pub_date=since)
+        response = admin_client.get(
+            '/api/v1/export/comments.ndjson',
+            {'since': since.isoformat()},
+        )
+        rows = read_stream(response).splitlines()
+        assert [json.loads(row)['id'] for row in rows] == [newest.id], (
+            'Проверьте, что параметр `since` оставляет только новые записи.'
+        )
+        response = admin_client.get(
+            '/api/v1/export/comments.ndjson', {'since': 'вчера'}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,115 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from reviews.models import Category, Genre, Review, Title, User
+
+
+@pytest.fixture
+def shelf():
+    User.objects.bulk_create(
+        User(username=f'reader_{idx}', email=f'reader_{idx}@yamdb.fake')
+        for idx in range(12)
+    )
+    users = list(User.objects.filter(username__startswith='reader_'))
+    film = Category.objects.create(name='Фильм', slug='film')
+    book = Category.objects.create(name='Книга', slug='book')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    titles = {
+        'lucky': Title.objects.create(name='Одна десятка', year=2000,
+                                      category=film),
+        'solid': Title.objects.create(name='Много девяток', year=2000,
+                                      category=film),
+        'book': Title.objects.create(name='Книга', year=2000,
+                                     category=book),
+    }
+    titles['book'].genre.set([drama])
+    Review.objects.create(
+        title=titles['lucky'], author=users[0], score=10, text='Отлично'
+    )
+    for user in users:
+        Review.objects.create(
+            title=titles['solid'], author=user, score=9, text='Хорошо'
+        )
+    old = Review.objects.create(
+        title=titles['book'], author=users[0], score=3, text='Плохо'
+    )
+    Review.objects.filter(pk=old.pk).update(
+        pub_date=timezone.now() - timedelta(days=30)
+    )
+    return titles, users
+
+
+def board(client, name, query=''):
+    response = client.get(f'/api/v1/leaderboards/{name}/{query}')
+    assert response.status_code == 200, response.content
+    return [entry['title']['id'] for entry in response.json()['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26Leaderboards:
+
+    def test_01_boards(self, client, shelf):
+        titles, _ = shelf
+        call_command('refresh-leaderboards', stdout=StringIO())
+        assert board(client, 'rating')[:2] == [
+            titles['solid'].id, titles['lucky'].id
+        ], (
+            'Проверьте, что байесовский рейтинг ставит много высоких '
+            'оценок выше одной максимальной.'
+        )
+        assert board(client, 'reviews')[0] == titles['solid'].id
+        assert titles['book'].id not in board(client, 'trending'), (
+            'Проверьте, что старые отзывы не учитываются в популярных.'
+        )
+
+    def test_02_scopes(self, client, shelf):
+        titles, _ = shelf
+        call_command('refresh-leaderboards', stdout=StringIO())
+        assert set(board(client, 'rating', '?category=film')) == {
+            titles['solid'].id, titles['lucky'].id
+        }
+        assert board(client, 'rating', '?genre=drama') == [
+            titles['book'].id
+        ]
+        assert board(client, 'rating', '?genre=comedy') == []
+        response = client.get(
+            '/api/v1/leaderboards/rating/?genre=drama&category=film'
+        )
+        assert response.status_code == 400
+
+    def test_03_refresh(self, client, shelf):
+        titles, users = shelf
+        call_command('refresh-leaderboards', stdout=StringIO())
+        assert titles['lucky'].id in board(client, 'trending')
+        for user in users[1:]:
+            Review.objects.create(
+                title=titles['book'], author=user, score=10, text='Шедевр'
+            )
+        Review.objects.filter(title=titles['lucky']).update(
+            pub_date=timezone.now() - timedelta(days=30)
+        )
+        call_command('refresh-leaderboards', stdout=StringIO())
+        assert board(client, 'trending', '?genre=drama') == [
+            titles['book'].id
+        ], 'Проверьте, что повторный пересчет учитывает новые отзывы.'
+        assert board(client, 'reviews', '?category=book') == [
+            titles['book'].id
+        ]
+        assert titles['lucky'].id not in board(
+            client, 'trending', '?category=film'
+        ), (
+            'Проверьте, что из популярных уходят произведения, отзывы на '
+            'которые вышли из окна, в том числе в областях без новых '
+            'отзывов.'
+        )
+
+    def test_04_page_queries(self, client, shelf,
+                             django_assert_num_queries):
+        call_command('refresh-leaderboards', stdout=StringIO())
+        # COUNT, страница с произведениями и категориями, жанры.
+        with django_assert_num_queries(3):
+            client.get('/api/v1/leaderboards/rating/')
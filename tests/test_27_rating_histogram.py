@@ -0,0 +1,94 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from reviews.models import SCORE_FIELDS, Title
+from reviews.utils import get_histogram_stats
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27RatingHistogram:
+
+    def test_01_histogram_follows_reviews(self, admin_client, user_client,
+                                          moderator_client, client,
+                                          django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/rating-histogram/'
+        create_single_review(user_client, title_id, 'text', 2)
+        create_single_review(admin_client, title_id, 'text', 9)
+        review = create_single_review(
+            moderator_client, title_id, 'text', 9
+        ).json()
+
+        with django_assert_num_queries(1):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert data['histogram']['9'] == 2 and data['histogram']['2'] == 1, (
+            'Проверьте, что гистограмма считает отзывы по оценкам.'
+        )
+        assert len(data['histogram']) == 10
+        assert data['count'] == 3
+        assert data['mean'] == pytest.approx(20 / 3)
+        assert data['median'] == 9
+
+        moderator_client.patch(
+            f'/api/v1/titles/{title_id}/reviews/{review["id"]}/',
+            data={'score': 4},
+        )
+        data = client.get(url).json()
+        assert (data['histogram']['9'], data['histogram']['4']) == (1, 1), (
+            'Проверьте, что изменение оценки переносит отзыв в другой '
+            'столбец гистограммы.'
+        )
+        assert data['median'] == 4
+
+        moderator_client.delete(
+            f'/api/v1/titles/{title_id}/reviews/{review["id"]}/'
+        )
+        data = client.get(url).json()
+        assert data['count'] == 2 and data['histogram']['4'] == 0
+        assert data['median'] == 5.5
+
+        response = client.get('/api/v1/titles/0/rating-histogram/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_empty_title(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        data = client.get(
+            f'/api/v1/titles/{titles[0]["id"]}/rating-histogram/'
+        ).json()
+        assert data['count'] == 0
+        assert data['mean'] is None and data['median'] is None
+
+    def test_03_rebuild_fixes_counters(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'text', 7)
+        Title.objects.filter(pk=titles[0]['id']).update(score_7=0, score_1=3)
+        with pytest.raises(CommandError):
+            call_command('rebuild-ratings', check=True, stdout=StringIO())
+        call_command('rebuild-ratings', stdout=StringIO())
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_7, title.score_1) == (1, 0), (
+            'Проверьте, что rebuild-ratings восстанавливает счетчики оценок.'
+        )
+
+    def test_04_stats(self):
+        assert get_histogram_stats({1: 1, 10: 1}) == (5.5, 5.5)
+        assert get_histogram_stats({3: 3, 8: 1}) == (4.25, 3)
+
+    def test_05_counters_follow_score_range(self):
+        counters = {
+            field.name
+            for field in Title._meta.get_fields()
+            if field.name.startswith('score_')
+        }
+        assert counters == set(SCORE_FIELDS.values()), (
+            'Проверьте, что счетчики оценок произведения соответствуют '
+            'диапазону MIN_SCORE..MAX_SCORE.'
+        )
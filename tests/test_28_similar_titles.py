@@ -0,0 +1,102 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Review, SimilarTitle, Title, User
+from reviews.similarity import RatingMatrix
+
+# Оценки пользователей: A и B нравятся одним и тем же, C — наоборот.
+SCORES = {
+    'alice': {'A': 10, 'B': 9, 'C': 2, 'D': 6},
+    'bob': {'A': 2, 'B': 3, 'C': 9, 'D': 6},
+    'carol': {'A': 9, 'B': 10, 'C': 1},
+    'dave': {'A': 3, 'B': 2, 'C': 10, 'D': 5},
+}
+
+
+@pytest.fixture
+def catalog():
+    titles = {
+        name: Title.objects.create(name=name, year=2000)
+        for name in 'ABCDE'
+    }
+    for username, scores in SCORES.items():
+        author = User.objects.create(
+            username=username, email=f'{username}@yamdb.fake'
+        )
+        for name, score in scores.items():
+            Review.objects.create(
+                title=titles[name], author=author, score=score, text='text'
+            )
+    return titles
+
+
+def similar_ids(client, title):
+    response = client.get(f'/api/v1/titles/{title.id}/similar/')
+    assert response.status_code == HTTPStatus.OK
+    return [entry['title']['id'] for entry in response.json()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28SimilarTitles:
+
+    def test_01_similar(self, client, catalog):
+        call_command(
+            'compute-similar-titles', workers=1, stdout=StringIO()
+        )
+        similar = similar_ids(client, catalog['A'])
+        assert similar[0] == catalog['B'].id, (
+            'Проверьте, что похожими считаются произведения с похожими '
+            'оценками одних и тех же пользователей.'
+        )
+        assert catalog['C'].id not in similar, (
+            'Проверьте, что произведения с противоположными оценками не '
+            'попадают в похожие.'
+        )
+        assert similar_ids(client, catalog['E']) == []
+        response = client.get('/api/v1/titles/0/similar/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_process_pool(self, catalog):
+        call_command(
+            'compute-similar-titles', workers=1, stdout=StringIO()
+        )
+        single = set(SimilarTitle.objects.values_list(
+            'title_id', 'similar_id'
+        ))
+        call_command(
+            'compute-similar-titles', workers=2, stdout=StringIO()
+        )
+        pooled = set(SimilarTitle.objects.values_list(
+            'title_id', 'similar_id'
+        ))
+        assert single and single == pooled, (
+            'Проверьте, что расчет в пуле процессов дает тот же результат.'
+        )
+
+    def test_03_incremental(self, client, catalog):
+        call_command(
+            'compute-similar-titles', workers=1, stdout=StringIO()
+        )
+        author = User.objects.create(username='erin', email='erin@e.fake')
+        for name, score in {'A': 10, 'B': 2, 'E': 10}.items():
+            Review.objects.create(
+                title=catalog[name], author=author, score=score, text='text'
+            )
+        out = StringIO()
+        call_command(
+            'compute-similar-titles', incremental=True, workers=1, stdout=out
+        )
+        assert catalog['E'].id in similar_ids(client, catalog['A']), (
+            'Проверьте, что инкрементальный пересчет учитывает новые '
+            'отзывы.'
+        )
+        matrix = RatingMatrix(
+            Review.objects.values_list('author_id', 'title_id', 'score')
+        )
+        expected = [
+            similar_id for _, similar_id in matrix.neighbors(catalog['C'].id)
+        ]
+        assert similar_ids(client, catalog['C']) == expected
@@ -0,0 +1,132 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.authentication import StatelessJWTAuthentication, get_access_token
+from api.views import UserViewSet
+from reviews.leaderboards import refresh_leaderboards
+from reviews.models import Recommendation, Review, Title, User
+
+# Оценки пользователей: A и B нравятся одним и тем же, C — наоборот.
+SCORES = {
+    'alice': {'A': 10, 'B': 9, 'C': 2, 'D': 6},
+    'bob': {'A': 2, 'B': 3, 'C': 9, 'D': 6},
+    'carol': {'A': 9, 'B': 10, 'C': 1},
+    'dave': {'A': 3, 'B': 2, 'C': 10, 'D': 5},
+}
+
+URL = '/api/v1/users/me/recommendations/'
+
+
+@pytest.fixture
+def catalog(user):
+    titles = {
+        name: Title.objects.create(name=name, year=2000)
+        for name in 'ABCDE'
+    }
+    for username, scores in SCORES.items():
+        author = User.objects.create(
+            username=username, email=f'{username}@yamdb.fake'
+        )
+        for name, score in scores.items():
+            Review.objects.create(
+                title=titles[name], author=author, score=score, text='text'
+            )
+    for name, score in {'A': 10, 'C': 2}.items():
+        Review.objects.create(
+            title=titles[name], author=user, score=score, text='text'
+        )
+    call_command('compute-similar-titles', workers=1, stdout=StringIO())
+    return titles
+
+
+def recommended_ids(client):
+    response = client.get(URL)
+    assert response.status_code == HTTPStatus.OK
+    return [entry['title']['id'] for entry in response.json()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29Recommendations:
+
+    def test_01_recommendations(self, client, user_client, catalog):
+        response = client.get(URL)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            f'Проверьте, что `{URL}` недоступен анонимному пользователю.'
+        )
+        call_command('compute-recommendations', stdout=StringIO())
+        recommended = recommended_ids(user_client)
+        assert recommended and recommended[0] == catalog['B'].id, (
+            'Проверьте, что первыми рекомендуются произведения, похожие '
+            'на высоко оцененные пользователем.'
+        )
+        assert not {catalog['A'].id, catalog['C'].id} & set(recommended), (
+            'Проверьте, что в рекомендации не попадают произведения, '
+            'которые пользователь уже оценил.'
+        )
+
+    def test_02_chunks(self, catalog):
+        call_command('compute-recommendations', stdout=StringIO())
+        whole = set(Recommendation.objects.values_list(
+            'user_id', 'title_id', 'score'
+        ))
+        call_command(
+            'compute-recommendations', chunk_size=1, stdout=StringIO()
+        )
+        chunked = set(Recommendation.objects.values_list(
+            'user_id', 'title_id', 'score'
+        ))
+        assert whole and whole == chunked, (
+            'Проверьте, что расчет пачками пользователей дает тот же '
+            'результат.'
+        )
+
+    def test_03_expired(self, user_client, catalog):
+        call_command('compute-recommendations', stdout=StringIO())
+        Recommendation.objects.update(expires=timezone.now())
+        refresh_leaderboards()
+        recommended = recommended_ids(user_client)
+        assert recommended and catalog['A'].id not in recommended, (
+            'Проверьте, что после истечения срока рекомендаций отдаются '
+            'лучшие по рейтингу произведения, которые пользователь не '
+            'оценивал.'
+        )
+        call_command('compute-recommendations', stdout=StringIO())
+        assert Recommendation.objects.filter(
+            expires__gt=timezone.now()
+        ).exists()
+
+    def test_04_reviewed_after_refresh(self, user, user_client, catalog):
+        call_command('compute-recommendations', stdout=StringIO())
+        recommended = recommended_ids(user_client)
+        Review.objects.create(
+            title_id=recommended[0], author=user, score=5, text='text'
+        )
+        assert recommended[0] not in recommended_ids(user_client), (
+            'Проверьте, что произведения, оцененные после расчета '
+            'рекомендаций, не попадают в ответ.'
+        )
+
+    def test_05_stateless_token(self, monkeypatch, user, catalog):
+        monkeypatch.setattr(
+            UserViewSet,
+            'authentication_classes',
+            (StatelessJWTAuthentication,),
+        )
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {get_access_token(user)}'
+        )
+        call_command('compute-recommendations', stdout=StringIO())
+        assert recommended_ids(client)[0] == catalog['B'].id, (
+            'Проверьте, что рекомендации работают с пользователем, '
+            'восстановленным из токена.'
+        )
+        Recommendation.objects.all().delete()
+        refresh_leaderboards()
+        recommended = recommended_ids(client)
+        assert recommended and catalog['A'].id not in recommended
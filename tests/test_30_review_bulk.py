@@ -0,0 +1,127 @@
+from http import HTTPStatus
+
+import pytest
+
+from api.views import ReviewBulkView
+from reviews.models import Review, Title
+from reviews.utils import get_stale_ratings
+from tests.utils import create_single_review, create_titles
+
+URL = '/api/v1/reviews/bulk/'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30ReviewBulk:
+
+    def test_01_bulk_create(self, admin_client, user_client, client, user):
+        titles, _, _ = create_titles(admin_client)
+        first, second = titles[0]['id'], titles[1]['id']
+        reviewed = Title.objects.create(name='Уже с отзывом', year=2000)
+        create_single_review(user_client, reviewed.id, 'text', 4)
+
+        data = [
+            {'title': first, 'text': 'Отзыв', 'score': 8},
+            {'title': second, 'text': 'Отзыв', 'score': 3},
+            {'title': first, 'text': 'Повтор', 'score': 5},
+            {'title': 0, 'text': 'Нет такого', 'score': 5},
+            {'title': second, 'text': 'Отзыв', 'score': 11},
+            {'title': reviewed.id, 'text': 'Повтор', 'score': 5},
+        ]
+        response = client.post(
+            URL, data=data, content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            f'Проверьте, что `{URL}` недоступен анонимному пользователю.'
+        )
+        response = user_client.post(URL, data=data, format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        results = response.json()
+        assert [result['status'] for result in results] == [
+            'created', 'created', 'error', 'error', 'error', 'error'
+        ], (
+            'Проверьте, что результат возвращается для каждого отзыва, а '
+            'ошибочные отзывы не мешают создать остальные.'
+        )
+        assert 'score' in results[4]['errors']
+        for result in results[:2]:
+            review = Review.objects.get(id=result['id'])
+            assert review.author == user
+            assert review.title_id == result['title']
+        assert Review.objects.filter(author=user).count() == 3
+        assert not get_stale_ratings(), (
+            'Проверьте, что рейтинги и счетчики оценок обновляются после '
+            'массового создания отзывов.'
+        )
+        assert Title.objects.get(id=first).rating == 8
+
+    def test_02_queries_do_not_grow(self, admin_client, user_client,
+                                    django_assert_max_num_queries):
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {idx}', year=2000)
+            for idx in range(40)
+        )
+        data = [
+            {'title': title_id, 'text': 'Отзыв', 'score': idx % 10 + 1}
+            for idx, title_id in enumerate(
+                Title.objects.values_list('id', flat=True)
+            )
+        ]
+        with django_assert_max_num_queries(16):
+            response = user_client.post(URL, data=data, format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        assert Review.objects.count() == len(data)
+        assert not get_stale_ratings()
+
+    def test_03_invalid_batch(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        for data in (
+            [],
+            {'title': titles[0]['id'], 'text': 'Отзыв', 'score': 5},
+            [{'title': titles[0]['id'], 'text': 'Отзыв', 'score': 5}] * 101,
+        ):
+            response = user_client.post(URL, data=data, format='json')
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                'Проверьте, что принимается только непустой список '
+                'ограниченной длины.'
+            )
+        response = user_client.post(
+            URL, data=[{'title': 0, 'text': 'Отзыв', 'score': 5}],
+            format='json',
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert not Review.objects.exists()
+
+    def test_04_concurrent_review(self, admin_client, user_client, user,
+                                  monkeypatch):
+        titles, _, _ = create_titles(admin_client)
+        first, second = titles[0]['id'], titles[1]['id']
+        check_titles = ReviewBulkView.check_titles
+
+        def check_then_review(user, title_ids):
+            checked = check_titles(user, title_ids)
+            # Отзыв из параллельного запроса появляется после проверки,
+            # но до вставки пакета.
+            Review.objects.get_or_create(
+                title_id=first, author=user, defaults={
+                    'score': 2, 'text': 'text'
+                }
+            )
+            return checked
+
+        monkeypatch.setattr(
+            ReviewBulkView, 'check_titles', staticmethod(check_then_review)
+        )
+        response = user_client.post(URL, data=[
+            {'title': first, 'text': 'Отзыв', 'score': 8},
+            {'title': second, 'text': 'Отзыв', 'score': 3},
+        ], format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что отзыв, созданный параллельным запросом, не '
+            'приводит к ошибке сервера.'
+        )
+        assert [result['status'] for result in response.json()] == [
+            'error', 'created'
+        ]
+        assert Review.objects.get(title_id=first).score == 2
+        assert Review.objects.filter(title_id=second).exists()
+        assert not get_stale_ratings()